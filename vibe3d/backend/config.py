@@ -62,6 +62,8 @@ DATA_DIR = BASE_DIR / "data"
 # ── Drone2Twin Pipeline ──────────────────────────────────────
 BLENDER_PATH = os.environ.get("BLENDER_PATH", "blender")
 COLMAP_PATH = os.environ.get("COLMAP_PATH", "colmap")
+COLMAP_GPU_INDICES = os.environ.get("COLMAP_GPU_INDICES", "")  # e.g. "0,1" — one feature_extractor per GPU
 RECON_ENGINE = os.environ.get("RECON_ENGINE", "colmap")  # colmap / realitycapture
+MAX_CONCURRENT_STAGES = int(os.environ.get("MAX_CONCURRENT_STAGES", "2"))  # heavy stages (Blender/COLMAP/Unity) at once
 DRONE_PROJECTS_DIR = os.environ.get("DRONE_PROJECTS_DIR", "")
 NGINX_DEPLOY_DIR = os.environ.get("NGINX_DEPLOY_DIR", "")
@@ -0,0 +1,130 @@
+"""Bulk directory enumeration for build-size scans.
+
+On macOS, getattrlistbulk(2) returns name, type and data length for many
+directory entries per syscall, instead of one readdir entry plus one stat
+per file. On other platforms ``walk_files`` is None and callers keep their
+os.scandir walk (on Linux, scandir + one statx per file is already minimal).
+"""
+
+import ctypes
+import os
+import stat
+import struct
+import sys
+from typing import Callable, Iterator, Optional
+
+# walk_files(root) yields (name, path, size) for every regular file under
+# root; symlinked directories are not followed, symlinked files resolve.
+walk_files: Optional[Callable[[str], Iterator[tuple[str, str, int]]]] = None
+
+
+if sys.platform == "darwin":
+    _ATTR_BIT_MAP_COUNT = 5
+    _ATTR_CMN_NAME = 0x00000001
+    _ATTR_CMN_OBJTYPE = 0x00000008
+    _ATTR_CMN_ERROR = 0x20000000
+    _ATTR_CMN_RETURNED_ATTRS = 0x80000000
+    _ATTR_FILE_DATALENGTH = 0x00000200
+
+    # fsobj_type_t values (sys/vnode.h)
+    _VREG = 1
+    _VDIR = 2
+    _VLNK = 5
+
+    _BUF_SIZE = 256 * 1024
+
+    class _AttrList(ctypes.Structure):
+        _fields_ = [
+            ("bitmapcount", ctypes.c_ushort),
+            ("reserved", ctypes.c_uint16),
+            ("commonattr", ctypes.c_uint32),
+            ("volattr", ctypes.c_uint32),
+            ("dirattr", ctypes.c_uint32),
+            ("fileattr", ctypes.c_uint32),
+            ("forkattr", ctypes.c_uint32),
+        ]
+
+    # Per entry: u_int32 length, attribute_set_t returned, then attributes
+    _ENTRY_HEAD = struct.Struct("=I5I")
+    _U32 = struct.Struct("=I")
+    _ATTRREF = struct.Struct("=iI")         # attr_dataoffset, attr_length
+    _OFF_T = struct.Struct("=q")
+
+    try:
+        _libc = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+        _getattrlistbulk = _libc.getattrlistbulk
+        _getattrlistbulk.argtypes = [
+            ctypes.c_int, ctypes.POINTER(_AttrList), ctypes.c_void_p,
+            ctypes.c_size_t, ctypes.c_uint64,
+        ]
+        _getattrlistbulk.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _getattrlistbulk = None
+
+    def _list_dir(path: str, attrs: _AttrList, buf) -> list[tuple[str, int, int]]:
+        """Return (name, objtype, size) for the entries of one directory."""
+        entries: list[tuple[str, int, int]] = []
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            while True:
+                count = _getattrlistbulk(fd, ctypes.byref(attrs), buf, _BUF_SIZE, 0)
+                if count < 0:
+                    err = ctypes.get_errno()
+                    raise OSError(err, os.strerror(err), path)
+                if count == 0:
+                    return entries
+                pos = 0
+                for _ in range(count):
+                    length, common, _vol, _dir, fileattr, _fork = _ENTRY_HEAD.unpack_from(buf, pos)
+                    p = pos + _ENTRY_HEAD.size
+                    pos += length
+                    if common & _ATTR_CMN_ERROR:
+                        if _U32.unpack_from(buf, p)[0]:
+                            continue
+                        p += _U32.size
+                    if not common & _ATTR_CMN_NAME:
+                        continue
+                    offset, name_len = _ATTRREF.unpack_from(buf, p)
+                    name = buf[p + offset:p + offset + name_len].split(b"\0", 1)[0]
+                    p += _ATTRREF.size
+                    objtype = 0
+                    if common & _ATTR_CMN_OBJTYPE:
+                        objtype = _U32.unpack_from(buf, p)[0]
+                        p += _U32.size
+                    size = 0
+                    if fileattr & _ATTR_FILE_DATALENGTH:
+                        size = _OFF_T.unpack_from(buf, p)[0]
+                    entries.append((os.fsdecode(name), objtype, size))
+        finally:
+            os.close(fd)
+
+    def _walk_files(root: str) -> Iterator[tuple[str, str, int]]:
+        attrs = _AttrList(
+            _ATTR_BIT_MAP_COUNT, 0,
+            _ATTR_CMN_RETURNED_ATTRS | _ATTR_CMN_NAME | _ATTR_CMN_OBJTYPE | _ATTR_CMN_ERROR,
+            0, 0, _ATTR_FILE_DATALENGTH, 0,
+        )
+        buf = ctypes.create_string_buffer(_BUF_SIZE)
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = _list_dir(current, attrs, buf)
+            except OSError:
+                continue
+            for name, objtype, size in entries:
+                path = os.path.join(current, name)
+                if objtype == _VDIR:
+                    stack.append(path)
+                elif objtype == _VREG:
+                    yield name, path, size
+                elif objtype == _VLNK:
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if stat.S_ISREG(st.st_mode):
+                        yield name, path, st.st_size
+
+    if _getattrlistbulk is not None:
+        walk_files = _walk_files
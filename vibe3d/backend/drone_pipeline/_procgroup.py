@@ -0,0 +1,78 @@
+"""Process-group spawning and shutdown for long-running CLI tools.
+
+Blender and COLMAP are started in their own session / process group so a
+timeout or cancelled stage can take down the whole tree — the tool and any
+helpers it spawned, which would otherwise keep running (and keep the output
+pipes open, so ``Process.wait()`` never returns).
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+from typing import Any
+
+# Extra create_subprocess_exec() arguments for a new process group
+SPAWN_KWARGS: dict[str, Any] = (
+    {"start_new_session": True} if os.name == "posix"
+    else {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+)
+
+# SIGTERM → SIGKILL grace period
+KILL_GRACE_SECONDS = 10.0
+
+# After the tool exits, how long to wait for its pipes to reach EOF (a child
+# process it spawned can keep them open)
+DRAIN_GRACE_SECONDS = 5.0
+
+# How often wait_exit() checks returncode while the pipes are still open
+_EXIT_POLL_SECONDS = 0.5
+
+
+async def wait_exit(proc: asyncio.subprocess.Process, timeout: float) -> None:
+    """Wait up to *timeout* seconds for *proc* itself to exit.
+
+    Before Python 3.12, ``Process.wait()`` also waits for the output pipes
+    to close, so a helper left holding them blocks it long after the tool
+    has exited.  The exit is picked up from ``returncode`` instead.
+
+    Raises:
+        asyncio.TimeoutError: If the process is still running at *timeout*.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    waiter = asyncio.ensure_future(proc.wait())
+    try:
+        while proc.returncode is None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            await asyncio.wait({waiter}, timeout=min(remaining, _EXIT_POLL_SECONDS))
+    finally:
+        waiter.cancel()
+
+
+async def terminate_process_group(proc: asyncio.subprocess.Process) -> None:
+    """Ask the child's process group to exit, then kill it after a grace period."""
+    if proc.returncode is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGTERM)   # pgid == pid (start_new_session)
+        else:
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+    except ProcessLookupError:
+        return
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=KILL_GRACE_SECONDS)
+        return
+    except asyncio.TimeoutError:
+        pass
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+    await proc.wait()
@@ -5,14 +5,22 @@ quality reports with scores, warnings, and recommendations.
 Uses only stdlib (struct for EXIF parsing, no PIL/OpenCV dependency).
 """
 
+import copy
+import functools
+import json
 import logging
 import math
 import os
 import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain, islice
 from pathlib import Path
 from typing import Optional
 
+from . import json_io
 from .models import InputOption, QAReport
+from .obj_folder_scanner import OBJ_CACHE_FILENAME, OBJFolderScanner
 
 logger = logging.getLogger(__name__)
 
@@ -34,58 +42,228 @@ _EXIF_GPS_LAT = 0x0002
 _EXIF_GPS_LON = 0x0004
 _EXIF_GPS_ALT = 0x0006
 
+# Precompiled struct formats (JPEG markers are big-endian; TIFF/EXIF either)
+_U16_BE = struct.Struct(">H")
+_U16_LE = struct.Struct("<H")
+_U32_BE = struct.Struct(">I")
+_U32_LE = struct.Struct("<I")
+
+# On-disk QAReport cache, written at the pack root
+QA_CACHE_FILENAME = ".ingest_qa_cache.json"
+
+# Packs whose last report is kept in memory (oldest dropped first)
+_REPORT_CACHE_MAX_ENTRIES = 32
+
+# Textures above this size (~8K) get a resize warning
+_TEXTURE_WARN_BYTES = 32 * 1024 * 1024
+
+# Per-image EXIF/blur analysis is I/O bound (open + read + stat)
+_IMAGE_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Open images relative to a held directory fd (openat) where supported
+_HAS_DIR_FD_OPEN = os.open in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+
+@dataclass
+class _PackScan:
+    """Result of the single os.scandir walk over a pack."""
+    entry_count: int = 0
+    max_mtime_ns: int = 0
+    total_size: int = 0
+    has_flightlog: bool = False                 # raw/flightlog has any entry
+    has_gcp: bool = False                       # raw/gcp has any entry
+    files: list[tuple[str, int]] = field(default_factory=list)   # (path, size)
+
+    @property
+    def fingerprint(self) -> tuple[int, int, int]:
+        """Cheap change key: (entry_count, max_mtime_ns, total_size)."""
+        return self.entry_count, self.max_mtime_ns, self.total_size
+
+
+def _scan_pack(root: str) -> _PackScan:
+    """Walk the pack once with os.scandir, collecting stats and folder flags.
+
+    The top-level reports/ folder and QA cache file are skipped because the
+    pipeline writes its own QA output there; so are OBJ scanner cache files.
+    """
+    scan = _PackScan()
+    flightlog_dir = os.path.join(root, "raw", "flightlog")
+    gcp_dir = os.path.join(root, "raw", "gcp")
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if current == flightlog_dir:
+                    scan.has_flightlog = True
+                elif current == gcp_dir:
+                    scan.has_gcp = True
+                if entry.name == OBJ_CACHE_FILENAME:
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if current == root and (
+                        entry.name == QA_CACHE_FILENAME or (is_dir and entry.name == "reports")
+                    ):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                scan.entry_count += 1
+                if st.st_mtime_ns > scan.max_mtime_ns:
+                    scan.max_mtime_ns = st.st_mtime_ns
+                if is_dir:
+                    stack.append(entry.path)
+                else:
+                    scan.total_size += st.st_size
+                    scan.files.append((entry.path, st.st_size))
+    return scan
+
+
+def _opener_at(dir_fd: int):
+    """open() opener resolving names relative to *dir_fd*."""
+    return lambda name, flags: os.open(name, flags, dir_fd=dir_fd)
+
+
+def _ext(path: str) -> str:
+    """Extension for matching against the *_EXTENSIONS sets.
+
+    Uses os.path.normcase so matching follows the platform's case rules,
+    like Path.glob (case-insensitive on Windows, exact on POSIX).
+    """
+    return os.path.splitext(os.path.normcase(path))[1]
+
+
+@functools.lru_cache(maxsize=4096)
+def _mesh_quality(mesh_path: str, mtime_ns: int, size: int) -> dict:
+    """Size-based mesh quality heuristic, memoized on (path, mtime, size)."""
+    size_mb = size / (1024 * 1024)
+    result = {"size_mb": round(size_mb, 1), "warnings": []}
+
+    if size_mb < 0.01:
+        result["warnings"].append("Mesh file appears empty or corrupted")
+    elif size_mb > 200:
+        result["warnings"].append(f"Mesh is {size_mb:.0f}MB — LOD optimization strongly recommended")
+        result["estimated_polycount"] = f"~{int(size_mb * 200_000):,} faces (rough estimate)"
+    elif size_mb > 50:
+        result["estimated_polycount"] = f"~{int(size_mb * 200_000):,} faces (rough estimate)"
+
+    return result
+
 
 class IngestQAEngine:
     """Analyzes drone/vendor packs for quality and completeness."""
 
+    def __init__(self):
+        # pack path → (tree fingerprint, report) for re-analysis / retries,
+        # least recently stored first (see _remember)
+        self._report_cache: dict[str, tuple[tuple[int, int, int], QAReport]] = {}
+
     def analyze_pack(self, pack_dir: str) -> QAReport:
         """Scan folder, auto-detect input option, produce quality report."""
         pack = Path(pack_dir)
         if not pack.is_dir():
             return QAReport(score=0, warnings=[f"Directory not found: {pack_dir}"])
 
+        cache_key = os.path.abspath(pack_dir)
+        scan = _scan_pack(str(pack))
+        fingerprint = scan.fingerprint
+        cached = self._report_cache.get(cache_key)
+        if cached is not None and cached[0] == fingerprint:
+            logger.debug("IngestQA: %s unchanged — reusing cached report", pack_dir)
+            return copy.deepcopy(cached[1])
+
+        report = self._load_cached_report(cache_key, fingerprint)
+        if report is not None:
+            logger.debug("IngestQA: %s unchanged — loaded %s", pack_dir, QA_CACHE_FILENAME)
+            self._remember(cache_key, fingerprint, report)
+            return report
+
         option = self._detect_input_option(pack)
         if option == InputOption.OBJ_FOLDER:
             report = self._analyze_obj_folder(pack)
         elif option == InputOption.VENDOR_PACK:
-            report = self._analyze_vendor_pack(pack)
+            report = self._analyze_vendor_pack(pack, scan)
         else:
-            report = self._analyze_raw_images(pack)
+            report = self._analyze_raw_images(pack, scan)
 
         report.input_option = option.value
         logger.info(
             "IngestQA: %s — option=%s, score=%d, warnings=%d",
             pack_dir, option.value, report.score, len(report.warnings),
         )
+        self._remember(cache_key, fingerprint, report)
+        self._save_cached_report(cache_key, fingerprint, report)
         return report
 
+    def _remember(self, cache_key: str, fingerprint: tuple, report: QAReport):
+        """Keep a copy of *report* in the bounded in-memory cache."""
+        self._report_cache.pop(cache_key, None)
+        self._report_cache[cache_key] = (fingerprint, copy.deepcopy(report))
+        while len(self._report_cache) > _REPORT_CACHE_MAX_ENTRIES:
+            del self._report_cache[next(iter(self._report_cache))]
+
+    # ── Report cache (pack-local file) ───────────────────────
+
+    def _load_cached_report(self, pack_dir: str, fingerprint: tuple) -> Optional[QAReport]:
+        """Return the persisted report if its key matches the current pack."""
+        cache_path = os.path.join(pack_dir, QA_CACHE_FILENAME)
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if tuple(data.get("key", ())) != fingerprint:
+                return None
+            return QAReport(**data["report"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("Ignoring unreadable QA cache %s: %s", cache_path, e)
+            return None
+
+    def _save_cached_report(self, pack_dir: str, fingerprint: tuple, report: QAReport):
+        """Persist the report next to the pack, keyed on the tree fingerprint.
+
+        Written to a temp file and renamed, so a crash can't leave a
+        truncated cache behind.
+        """
+        cache_path = os.path.join(pack_dir, QA_CACHE_FILENAME)
+        try:
+            json_io.write_json(
+                cache_path,
+                {"key": list(fingerprint), "report": report.to_dict()},
+                indent=False,
+                atomic=True,
+            )
+        except OSError as e:
+            logger.debug("Could not write QA cache %s: %s", cache_path, e)
+
     # ── Option detection ─────────────────────────────────────
 
     def _detect_input_option(self, pack: Path) -> InputOption:
         """Detect whether this is a vendor pack (mesh files) or raw images."""
-        # Check for OBJ tile pattern first (Tile-*.obj files)
-        tile_objs = list(pack.glob("Tile-*.obj"))
+        # Check for OBJ tile pattern first (Tile-*.obj files); two are enough
+        tile_objs = list(islice(pack.glob("Tile-*.obj"), 2))
         if not tile_objs:
-            tile_objs = list(pack.glob("**/Tile-*.obj"))
+            tile_objs = list(islice(pack.glob("**/Tile-*.obj"), 2))
         if len(tile_objs) >= 2:
             return InputOption.OBJ_FOLDER
 
-        # Check for mesh files in root or vendor/ subfolder
-        mesh_found = False
+        # Check for mesh files in root or vendor/ subfolder (first hit wins)
         for ext in MESH_EXTENSIONS:
-            if list(pack.glob(f"*{ext}")) or list(pack.glob(f"vendor/*{ext}")):
-                mesh_found = True
-                break
-
-        # Check for image files in root or raw/images/ subfolder
-        image_count = 0
-        for ext in IMAGE_EXTENSIONS:
-            image_count += len(list(pack.glob(f"*{ext}")))
-            image_count += len(list(pack.glob(f"raw/images/*{ext}")))
-
-        if mesh_found:
-            return InputOption.VENDOR_PACK
-        if image_count >= 5:
+            if (next(pack.glob(f"*{ext}"), None) is not None
+                    or next(pack.glob(f"vendor/*{ext}"), None) is not None):
+                return InputOption.VENDOR_PACK
+
+        # Check for image files in root or raw/images/ subfolder (stop at 5)
+        images = chain.from_iterable(
+            chain(pack.glob(f"*{ext}"), pack.glob(f"raw/images/*{ext}"))
+            for ext in IMAGE_EXTENSIONS
+        )
+        if sum(1 for _ in islice(images, 5)) >= 5:
             return InputOption.RAW_IMAGES
 
         # Default to vendor pack if ambiguous
@@ -93,15 +271,17 @@ class IngestQAEngine:
 
     # ── Vendor Pack Analysis (Option A) ──────────────────────
 
-    def _analyze_vendor_pack(self, pack: Path) -> QAReport:
+    def _analyze_vendor_pack(self, pack: Path, scan: _PackScan) -> QAReport:
         """Analyze vendor-processed pack: mesh quality, textures, metadata."""
         report = QAReport(score=50)  # base score
 
-        # Scan for mesh files
-        mesh_files = []
-        for ext in MESH_EXTENSIONS:
-            mesh_files.extend(pack.glob(f"**/*{ext}"))
-        report.mesh_files = [str(f) for f in mesh_files]
+        # Mesh files and their total size, straight from the pack scan
+        mesh_files = report.mesh_files
+        total_mesh_size = 0
+        for path, size in scan.files:
+            if _ext(path) in MESH_EXTENSIONS:
+                mesh_files.append(path)
+                total_mesh_size += size
 
         if not mesh_files:
             report.score = 10
@@ -113,7 +293,6 @@ class IngestQAEngine:
         report.score += 15
 
         # Check mesh file sizes
-        total_mesh_size = sum(f.stat().st_size for f in mesh_files)
         report.total_size_mb = round(total_mesh_size / (1024 * 1024), 1)
 
         if total_mesh_size < 1024:
@@ -123,18 +302,19 @@ class IngestQAEngine:
             report.warnings.append(f"Total mesh size {report.total_size_mb}MB — very large, LOD optimization critical")
 
         # Check for textures
-        tex_files = []
-        for ext in TEXTURE_EXTENSIONS:
-            tex_files.extend(pack.glob(f"**/*{ext}"))
-        report.texture_files = [str(f) for f in tex_files]
+        tex_files = report.texture_files
+        for path, size in scan.files:
+            if _ext(path) not in TEXTURE_EXTENSIONS:
+                continue
+            tex_files.append(path)
+            # Check for oversized textures (> 8K)
+            if size > _TEXTURE_WARN_BYTES:
+                report.warnings.append(
+                    f"Texture {os.path.basename(path)} is {size / (1024 * 1024):.0f}MB — may need resize"
+                )
 
         if tex_files:
             report.score += 10
-            # Check for oversized textures (> 8K)
-            for tf in tex_files:
-                size_mb = tf.stat().st_size / (1024 * 1024)
-                if size_mb > 32:
-                    report.warnings.append(f"Texture {tf.name} is {size_mb:.0f}MB — may need resize")
         else:
             report.recommendations.append("No textures found — mesh may appear untextured")
 
@@ -147,7 +327,9 @@ class IngestQAEngine:
             report.recommendations.append("No metadata.json — scale/coordinate verification recommended")
 
         # Check for LOD variants
-        lod_count = sum(1 for f in mesh_files if "lod" in f.stem.lower())
+        lod_count = sum(
+            1 for f in mesh_files if "lod" in os.path.splitext(os.path.basename(f))[0].lower()
+        )
         if lod_count >= 2:
             report.score += 10
             report.recommendations.append(f"{lod_count} LOD variants found — can skip LOD generation")
@@ -155,10 +337,7 @@ class IngestQAEngine:
             report.recommendations.append("No LOD variants — will generate LOD0/1/2 during optimization")
 
         # Check for point cloud (useful for validation)
-        pc_files = []
-        for ext in POINTCLOUD_EXTENSIONS:
-            pc_files.extend(pack.glob(f"**/*{ext}"))
-        if pc_files:
+        if any(_ext(path) in POINTCLOUD_EXTENSIONS for path, _ in scan.files):
             report.score += 5
             report.recommendations.append("Point cloud found — useful for scale/alignment verification")
 
@@ -167,15 +346,13 @@ class IngestQAEngine:
 
     # ── Raw Images Analysis (Option B) ───────────────────────
 
-    def _analyze_raw_images(self, pack: Path) -> QAReport:
+    def _analyze_raw_images(self, pack: Path, scan: _PackScan) -> QAReport:
         """Analyze raw drone/camera images: EXIF, blur, overlap, GPS."""
         report = QAReport(score=40)  # base score for having images
 
         # Find all images
-        image_paths = []
-        for ext in IMAGE_EXTENSIONS:
-            image_paths.extend(pack.glob(f"**/*{ext}"))
-        report.image_count = len(image_paths)
+        images = [f for f in scan.files if _ext(f[0]) in IMAGE_EXTENSIONS]
+        report.image_count = len(images)
 
         if report.image_count == 0:
             report.score = 5
@@ -189,19 +366,42 @@ class IngestQAEngine:
 
         # Analyze EXIF for each image
         gps_coords = []
-        resolutions = []
+        res_count = 0
+        res_w_sum = 0
+        res_h_sum = 0
         focal_lengths = []
         blur_count = 0
 
-        for img_path in image_paths:
-            exif = self._parse_exif_basic(img_path)
+        # One directory fd per image folder; workers open files relative to it
+        dir_fds: dict[str, Optional[int]] = {}
+        if _HAS_DIR_FD_OPEN:
+            for path, _ in images:
+                parent = os.path.dirname(path)
+                if parent not in dir_fds:
+                    try:
+                        dir_fds[parent] = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+                    except OSError:
+                        dir_fds[parent] = None
+        try:
+            with ThreadPoolExecutor(max_workers=_IMAGE_IO_WORKERS) as pool:
+                results = list(pool.map(
+                    functools.partial(self._analyze_one_image, dir_fds=dir_fds), images,
+                ))
+        finally:
+            for fd in dir_fds.values():
+                if fd is not None:
+                    os.close(fd)
+
+        for exif, is_blurry in results:
             if exif is None:
                 continue
 
             # Resolution
             w, h = exif.get("width", 0), exif.get("height", 0)
             if w and h:
-                resolutions.append((w, h))
+                res_count += 1
+                res_w_sum += w
+                res_h_sum += h
 
             # GPS
             if exif.get("has_gps"):
@@ -215,15 +415,15 @@ class IngestQAEngine:
                 focal_lengths.append(fl)
 
             # Blur estimation (file size heuristic)
-            if self._estimate_blur(img_path):
+            if is_blurry:
                 blur_count += 1
 
         report.blur_count = blur_count
 
         # Resolution stats
-        if resolutions:
-            avg_w = sum(r[0] for r in resolutions) // len(resolutions)
-            avg_h = sum(r[1] for r in resolutions) // len(resolutions)
+        if res_count:
+            avg_w = res_w_sum // res_count
+            avg_h = res_h_sum // res_count
             report.avg_resolution = f"{avg_w}x{avg_h}"
             if avg_w >= 4000:
                 report.score += 10
@@ -256,22 +456,20 @@ class IngestQAEngine:
             report.score += 5
 
         # Check for flight log
-        log_dir = pack / "raw" / "flightlog"
-        if log_dir.is_dir() and any(log_dir.iterdir()):
+        if scan.has_flightlog:
             report.score += 5
             report.recommendations.append("Flight log found — can verify altitude/coverage")
         else:
             report.recommendations.append("No flight log — upload for better QA analysis")
 
         # Check for GCP
-        gcp_dir = pack / "raw" / "gcp"
-        if gcp_dir.is_dir() and any(gcp_dir.iterdir()):
+        if scan.has_gcp:
             report.gcp_available = True
             report.score += 5
             report.recommendations.append("GCP data found — will improve georeferencing accuracy")
 
         # Total size
-        total = sum(f.stat().st_size for f in image_paths)
+        total = sum(size for _, size in images)
         report.total_size_mb = round(total / (1024 * 1024), 1)
 
         report.score = max(0, min(100, report.score))
@@ -281,8 +479,6 @@ class IngestQAEngine:
 
     def _analyze_obj_folder(self, pack: Path) -> QAReport:
         """Analyze OBJ tile folder: tile count, MTL/texture completeness."""
-        from .obj_folder_scanner import OBJFolderScanner
-
         report = QAReport(score=50)  # base score
         scanner = OBJFolderScanner()
 
@@ -339,12 +535,31 @@ class IngestQAEngine:
         report.score = min(100, report.score)
         return report
 
+    def _analyze_one_image(
+        self, image: tuple[str, int], dir_fds: Optional[dict] = None,
+    ) -> tuple[Optional[dict], bool]:
+        """Per-image worker: EXIF summary and blur flag (runs in thread pool)."""
+        path, size = image
+        dir_fd = dir_fds.get(os.path.dirname(path)) if dir_fds else None
+        exif = self._parse_exif_basic(Path(path), dir_fd=dir_fd)
+        if exif is None:
+            return None, False
+        return exif, self._estimate_blur(size)
+
     # ── EXIF parsing (stdlib only) ───────────────────────────
 
-    def _parse_exif_basic(self, image_path: Path) -> Optional[dict]:
-        """Parse basic EXIF data from JPEG using struct (no PIL)."""
+    def _parse_exif_basic(self, image_path: Path, dir_fd: Optional[int] = None) -> Optional[dict]:
+        """Parse basic EXIF data from JPEG using struct (no PIL).
+
+        If *dir_fd* is an open fd of the image's folder, the file is opened
+        relative to it instead of resolving the full path again.
+        """
+        if dir_fd is not None:
+            target, opener = image_path.name, _opener_at(dir_fd)
+        else:
+            target, opener = image_path, None
         try:
-            with open(image_path, "rb") as f:
+            with open(target, "rb", opener=opener) as f:
                 header = f.read(2)
                 if header != b"\xff\xd8":
                     return None  # not JPEG
@@ -362,7 +577,7 @@ class IngestQAEngine:
                     length_bytes = f.read(2)
                     if len(length_bytes) < 2:
                         break
-                    length = struct.unpack(">H", length_bytes)[0]
+                    length = _U16_BE.unpack(length_bytes)[0]
 
                     if marker[1] == 0xE1:  # APP1 (EXIF)
                         data = f.read(length - 2)
@@ -374,7 +589,7 @@ class IngestQAEngine:
 
                 # Fallback: get resolution from file size heuristic
                 if result["width"] == 0:
-                    fsize = image_path.stat().st_size
+                    fsize = os.fstat(f.fileno()).st_size
                     # Rough estimate: typical JPEG compression ~1/10
                     pixels = fsize * 10
                     side = int(math.sqrt(pixels * 4 / 3))  # assume 4:3
@@ -395,30 +610,28 @@ class IngestQAEngine:
         # Byte order
         bo = data[:2]
         if bo == b"MM":
-            endian = ">"
+            u16, u32 = _U16_BE, _U32_BE
         elif bo == b"II":
-            endian = "<"
+            u16, u32 = _U16_LE, _U32_LE
         else:
             return result
 
         try:
             # IFD0 offset
-            ifd_offset = struct.unpack(f"{endian}I", data[4:8])[0]
+            ifd_offset = u32.unpack_from(data, 4)[0]
             if ifd_offset + 2 > len(data):
                 return result
 
-            num_entries = struct.unpack(f"{endian}H", data[ifd_offset:ifd_offset + 2])[0]
-            offset = ifd_offset + 2
+            num_entries = u16.unpack_from(data, ifd_offset)[0]
+            start = ifd_offset + 2
 
-            for _ in range(min(num_entries, 100)):
-                if offset + 12 > len(data):
-                    break
-                tag = struct.unpack(f"{endian}H", data[offset:offset + 2])[0]
-
-                if tag == _EXIF_GPS_IFD_TAG:
+            # Bound the entry count once instead of re-checking per entry
+            count = min(num_entries, 100, (len(data) - start) // 12)
+            unpack_tag = u16.unpack_from
+            for offset in range(start, start + count * 12, 12):
+                if unpack_tag(data, offset)[0] == _EXIF_GPS_IFD_TAG:
                     result["has_gps"] = True
-
-                offset += 12
+                    break
 
         except Exception:
             pass
@@ -427,22 +640,17 @@ class IngestQAEngine:
 
     # ── Blur estimation (no OpenCV) ──────────────────────────
 
-    def _estimate_blur(self, image_path: Path) -> bool:
+    def _estimate_blur(self, size: int) -> bool:
         """Estimate if image is blurry using file size heuristic.
 
         Well-focused images tend to have higher JPEG file sizes relative
         to their resolution because of more high-frequency detail.
         This is a rough heuristic — Pillow/OpenCV Laplacian is more accurate.
+        Takes the size already collected by the pack scan (no extra stat).
         """
-        try:
-            fsize = image_path.stat().st_size
-            # Very small files for high-res cameras are likely blurry
-            # Typical 12MP JPEG: 3-8MB focused, 1-3MB blurry
-            if fsize < 500_000:  # < 500KB for any image is suspicious
-                return True
-            return False
-        except Exception:
-            return False
+        # Very small files for high-res cameras are likely blurry
+        # Typical 12MP JPEG: 3-8MB focused, 1-3MB blurry
+        return size < 500_000  # < 500KB for any image is suspicious
 
     # ── Overlap estimation ───────────────────────────────────
 
@@ -463,15 +671,6 @@ class IngestQAEngine:
 
     def _check_mesh_quality(self, mesh_path: Path) -> dict:
         """Basic mesh quality check using file size heuristics."""
-        size_mb = mesh_path.stat().st_size / (1024 * 1024)
-        result = {"size_mb": round(size_mb, 1), "warnings": []}
-
-        if size_mb < 0.01:
-            result["warnings"].append("Mesh file appears empty or corrupted")
-        elif size_mb > 200:
-            result["warnings"].append(f"Mesh is {size_mb:.0f}MB — LOD optimization strongly recommended")
-            result["estimated_polycount"] = f"~{int(size_mb * 200_000):,} faces (rough estimate)"
-        elif size_mb > 50:
-            result["estimated_polycount"] = f"~{int(size_mb * 200_000):,} faces (rough estimate)"
-
-        return result
+        st = mesh_path.stat()
+        result = _mesh_quality(str(mesh_path), st.st_mtime_ns, st.st_size)
+        return {**result, "warnings": list(result["warnings"])}
@@ -0,0 +1,69 @@
+"""JSON encode/decode helpers for Drone2Twin report and state files.
+
+Uses orjson (C encoder, bytes in/out) when installed and falls back to the
+stdlib json module otherwise. Output matches the previous
+``json.dump(..., indent=2, ensure_ascii=False)`` files: UTF-8, 2-space indent.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize *obj* to UTF-8 JSON bytes."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: Union[str, Path], obj: Any, *, indent: bool = True, atomic: bool = False):
+    """Write *obj* to *path* as JSON (indented by default).
+
+    With ``atomic=True`` the data goes to a temp file next to *path* that is
+    then renamed over it, so a crash never leaves a truncated file behind.
+    """
+    data = dumps(obj, indent=indent)
+    if not atomic:
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    path = os.fspath(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, "rb") as f:
+        return loads(f.read())
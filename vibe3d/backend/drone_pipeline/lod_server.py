@@ -4,8 +4,11 @@ Scans the CityTiles/{tile}/LOD/ directories for exported OBJ LOD files
 and provides metadata (file sizes, URLs) to the frontend for progressive loading.
 """
 
+import functools
 import logging
-import re
+import os
+import stat
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -16,9 +19,21 @@ logger = logging.getLogger(__name__)
 # LOD level labels
 LOD_LEVELS = ("LOD0", "LOD1", "LOD2")
 
+# discover_lod_metadata() cache: tiles_dir → (st_mtime_ns, built_at, result).
+# The CityTiles mtime only changes when tile folders are added/removed, so
+# entries also expire after a short TTL to pick up LOD exports inside them.
+_CACHE: dict[str, tuple[int, float, dict]] = {}
+_CACHE_TTL_SECONDS = 30.0
 
+
+def clear_cache():
+    """Drop cached LOD metadata (next discover_lod_metadata() rescans)."""
+    _CACHE.clear()
+
+
+@functools.cache
 def get_citytiles_dir() -> Path:
-    """Get the CityTiles asset directory."""
+    """Get the CityTiles asset directory (config is fixed for the process)."""
     return Path(config.UNITY_PROJECT_PATH) / "Assets" / "CityTiles"
 
 
@@ -44,67 +59,113 @@ def discover_lod_metadata() -> dict:
         }
     """
     tiles_dir = get_citytiles_dir()
-    if not tiles_dir.is_dir():
+    try:
+        st = tiles_dir.stat()
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISDIR(st.st_mode):
         return {"tiles": [], "has_lods": False, "total_lod2_mb": 0, "total_lod0_mb": 0}
 
-    tile_re = re.compile(r"Tile-(\d+)-(\d+)")
+    cache_key = str(tiles_dir)
+    cached = _CACHE.get(cache_key)
+    now = time.monotonic()
+    if cached is not None and cached[0] == st.st_mtime_ns and now - cached[1] < _CACHE_TTL_SECONDS:
+        return cached[2]
+
+    result = _scan_lod_metadata(tiles_dir)
+    _CACHE[cache_key] = (st.st_mtime_ns, now, result)
+    return result
+
+
+def _parse_tile_row_col(name: str) -> Optional[tuple[int, int]]:
+    """Parse row/col from a Skyline tile name ("Tile-37-26-1-1" → (37, 26))."""
+    parts = name.split("-", 3)
+    if len(parts) < 3 or parts[0] != "Tile":
+        return None
+    row, col = parts[1], parts[2]
+    if not (row.isdecimal() and col.isdecimal()):
+        return None
+    return int(row), int(col)
+
+
+def _scan_lod_metadata(tiles_dir: Path) -> dict:
+    """Walk the CityTiles folders and build the discover_lod_metadata() payload."""
     tiles = []
     total_lod0 = 0.0
     total_lod2 = 0.0
     has_any_lods = False
 
-    for folder in sorted(tiles_dir.iterdir()):
-        if not folder.is_dir():
-            continue
-        m = tile_re.search(folder.name)
-        if not m:
-            continue
+    with os.scandir(tiles_dir) as it:
+        folders = [e for e in it if e.is_dir()]
 
-        row, col = int(m.group(1)), int(m.group(2))
+    for folder in folders:
+        row_col = _parse_tile_row_col(folder.name)
+        if row_col is None:
+            continue
 
-        # Find original OBJ (LOD0)
-        obj_files = list(folder.glob("*.obj"))
-        if not obj_files:
+        row, col = row_col
+
+        # One pass over the tile folder: classify OBJ / MTL / textures
+        obj_entry = None
+        names = set()
+        jpg_names = []
+        png_names = []
+        with os.scandir(folder.path) as it:
+            for entry in it:
+                name = entry.name
+                names.add(name)
+                if name.endswith(".obj"):
+                    if obj_entry is None and entry.is_file():
+                        obj_entry = entry
+                elif name.endswith(".jpg"):
+                    jpg_names.append(name)
+                elif name.endswith(".png"):
+                    png_names.append(name)
+
+        # Original OBJ (LOD0)
+        if obj_entry is None:
             continue
 
-        obj_file = obj_files[0]
-        lod0_size = obj_file.stat().st_size / (1024 * 1024)
+        obj_name = obj_entry.name
+        lod0_size = obj_entry.stat().st_size / (1024 * 1024)
         total_lod0 += lod0_size
 
-        # Find MTL
-        mtl_file = obj_file.with_suffix(".mtl")
-        mtl_url = f"/api/drone/citytiles/{folder.name}/{mtl_file.name}" if mtl_file.exists() else None
-
-        # Find textures
-        tex_files = list(folder.glob("*.jpg")) + list(folder.glob("*.png"))
+        # Matching MTL
+        mtl_name = obj_name[:-4] + ".mtl"
+        mtl_url = f"/api/drone/citytiles/{folder.name}/{mtl_name}" if mtl_name in names else None
 
         lod_levels = {
             "lod0": {
-                "url": f"/api/drone/citytiles/{folder.name}/{obj_file.name}",
+                "url": f"/api/drone/citytiles/{folder.name}/{obj_name}",
                 "size_mb": round(lod0_size, 1),
             },
         }
 
-        # Check for LOD subfolder
-        lod_dir = folder / "LOD"
-        if lod_dir.is_dir():
-            for lod_file in sorted(lod_dir.glob("*_LOD*.obj")):
-                fname = lod_file.name
-                size_mb = lod_file.stat().st_size / (1024 * 1024)
-
-                if "_LOD1" in fname:
-                    lod_levels["lod1"] = {
-                        "url": f"/api/drone/citytiles/{folder.name}/LOD/{fname}",
-                        "size_mb": round(size_mb, 1),
-                    }
-                    has_any_lods = True
-                elif "_LOD2" in fname:
-                    lod_levels["lod2"] = {
-                        "url": f"/api/drone/citytiles/{folder.name}/LOD/{fname}",
-                        "size_mb": round(size_mb, 1),
-                    }
-                    total_lod2 += size_mb
-                    has_any_lods = True
+        # LOD subfolder (absent for tiles that were never LOD-exported)
+        try:
+            with os.scandir(os.path.join(folder.path, "LOD")) as it:
+                lod_entries = sorted(
+                    (e for e in it if e.name.endswith(".obj") and "_LOD" in e.name),
+                    key=lambda e: e.name,
+                )
+        except (FileNotFoundError, NotADirectoryError):
+            lod_entries = []
+
+        for lod_entry in lod_entries:
+            fname = lod_entry.name
+            idx = fname.rfind("_LOD")
+            level = fname[idx + 4:idx + 5]
+            if level not in ("1", "2"):
+                continue
+
+            size_mb = lod_entry.stat().st_size / (1024 * 1024)
+            lod_levels["lod" + level] = {
+                "url": f"/api/drone/citytiles/{folder.name}/LOD/{fname}",
+                "size_mb": round(size_mb, 1),
+            }
+            if level == "2":
+                total_lod2 += size_mb
+            has_any_lods = True
 
         tile_info = {
             "name": folder.name,
@@ -112,10 +173,12 @@ def discover_lod_metadata() -> dict:
             "col": col,
             "lod_levels": lod_levels,
             "mtl_url": mtl_url,
-            "textures": [t.name for t in tex_files],
+            "textures": jpg_names + png_names,
         }
         tiles.append(tile_info)
 
+    tiles.sort(key=lambda t: t["name"])
+
     return {
         "tiles": tiles,
         "has_lods": has_any_lods,
@@ -124,20 +187,3 @@ def discover_lod_metadata() -> dict:
         "total_lod2_mb": round(total_lod2, 1),
     }
 
-
-def get_lod_file_path(tile_name: str, filename: str) -> Optional[Path]:
-    """Get the full filesystem path for a LOD file.
-
-    Args:
-        tile_name: e.g. "Tile-37-26-1-1"
-        filename: e.g. "mesh_LOD1.obj"
-
-    Returns:
-        Path if file exists, None otherwise.
-    """
-    tiles_dir = get_citytiles_dir()
-    file_path = tiles_dir / tile_name / "LOD" / filename
-
-    if file_path.is_file():
-        return file_path
-    return None
@@ -3,9 +3,10 @@
 Defines project state, pipeline stages, QA/optimize reports, and artifacts.
 """
 
+import copy
 import time
 import uuid
-from dataclasses import asdict, dataclass, field
+from dataclasses import MISSING, dataclass, field, fields
 from enum import Enum
 from typing import Any, Optional
 
@@ -39,30 +40,46 @@ class Preset(str, Enum):
     PRODUCTION = "production"     # slow, highest quality (overnight batch)
 
 
+# value → member tables for from_dict (plain dict hit instead of Enum.__call__)
+_INPUT_OPTION_BY_VALUE = {e.value: e for e in InputOption}
+_PIPELINE_STAGE_BY_VALUE = {e.value: e for e in PipelineStage}
+_PRESET_BY_VALUE = {e.value: e for e in Preset}
+
+
 # ── OBJ Tile Info ────────────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OBJTileInfo:
-    """Info about a single OBJ tile from a city-view tile set."""
+    """Info about a single OBJ tile from a city-view tile set (immutable)."""
     name: str = ""
     row: int = 0
     col: int = 0
     obj_path: str = ""
     mtl_path: str = ""
-    texture_paths: list[str] = field(default_factory=list)
+    texture_paths: tuple[str, ...] = ()
     size_mb: float = 0.0
     vertex_count: int = 0
     face_count: int = 0
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "name": self.name,
+            "row": self.row,
+            "col": self.col,
+            "obj_path": self.obj_path,
+            "mtl_path": self.mtl_path,
+            "texture_paths": list(self.texture_paths),
+            "size_mb": self.size_mb,
+            "vertex_count": self.vertex_count,
+            "face_count": self.face_count,
+        }
 
 
 # ── Reports ─────────────────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class QAReport:
     """Ingest quality analysis report."""
     score: int = 0                              # 0-100 quality score
@@ -81,10 +98,29 @@ class QAReport:
     obj_tiles: list[dict] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "score": self.score,
+            "input_option": self.input_option,
+            "image_count": self.image_count,
+            "avg_resolution": self.avg_resolution,
+            "blur_count": self.blur_count,
+            "exif_gps_missing": self.exif_gps_missing,
+            "overlap_estimate": self.overlap_estimate,
+            "gcp_available": self.gcp_available,
+            "mesh_files": list(self.mesh_files),
+            "texture_files": list(self.texture_files),
+            "total_size_mb": self.total_size_mb,
+            "warnings": list(self.warnings),
+            "recommendations": list(self.recommendations),
+            # Tile dicts (and their texture lists) are copied, as asdict() did
+            "obj_tiles": [
+                {**t, "texture_paths": list(t["texture_paths"])} if "texture_paths" in t else dict(t)
+                for t in self.obj_tiles
+            ],
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ReconReport:
     """Reconstruction stage report."""
     engine: str = ""                            # "colmap" / "realitycapture" / etc.
@@ -98,12 +134,26 @@ class ReconReport:
     coordinate_system: str = ""
     elapsed_seconds: float = 0.0
     warnings: list[str] = field(default_factory=list)
+    input_manifest: str = ""                    # digest of the input images (name/size/mtime)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "engine": self.engine,
+            "preset": self.preset,
+            "image_count": self.image_count,
+            "tie_points": self.tie_points,
+            "avg_reprojection_error": self.avg_reprojection_error,
+            "dense_points": self.dense_points,
+            "mesh_vertices": self.mesh_vertices,
+            "mesh_faces": self.mesh_faces,
+            "coordinate_system": self.coordinate_system,
+            "elapsed_seconds": self.elapsed_seconds,
+            "warnings": list(self.warnings),
+            "input_manifest": self.input_manifest,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class OptimizeReport:
     """Mesh optimization report."""
     input_polycount: int = 0
@@ -116,10 +166,19 @@ class OptimizeReport:
     warnings: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "input_polycount": self.input_polycount,
+            "output_polycounts": dict(self.output_polycounts),
+            "texture_sizes": list(self.texture_sizes),
+            "decimation_ratio": self.decimation_ratio,
+            "output_files": list(self.output_files),
+            "blender_available": self.blender_available,
+            "elapsed_seconds": self.elapsed_seconds,
+            "warnings": list(self.warnings),
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class PerfReport:
     """WebGL performance analysis report."""
     total_size_mb: float = 0.0
@@ -134,13 +193,61 @@ class PerfReport:
     warnings: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "total_size_mb": self.total_size_mb,
+            "wasm_size_mb": self.wasm_size_mb,
+            "data_size_mb": self.data_size_mb,
+            "js_size_mb": self.js_size_mb,
+            "texture_count": self.texture_count,
+            "lod_files": self.lod_files,
+            "estimated_load_time_3g": self.estimated_load_time_3g,
+            "estimated_load_time_4g": self.estimated_load_time_4g,
+            "estimated_load_time_wifi": self.estimated_load_time_wifi,
+            "warnings": list(self.warnings),
+        }
+
+
+def _field_specs(cls) -> tuple:
+    """(name, default, default_factory) for each dataclass field of *cls*."""
+    return tuple(
+        (f.name, f.default, None if f.default is not MISSING else f.default_factory)
+        for f in fields(cls)
+    )
+
+
+_REPORT_FIELD_SPECS = {
+    cls: _field_specs(cls) for cls in (QAReport, ReconReport, OptimizeReport, PerfReport)
+}
+_REPORT_FIELD_NAMES = {
+    cls: frozenset(name for name, _, _ in specs) for cls, specs in _REPORT_FIELD_SPECS.items()
+}
+
+
+def _report_from_dict(cls, d: dict):
+    """Build a report from *d* like ``cls(**d)``, but without running __init__.
+
+    Missing keys take the field default; unknown keys raise TypeError.
+    """
+    specs = _REPORT_FIELD_SPECS[cls]
+    names = _REPORT_FIELD_NAMES[cls]
+    if not d.keys() <= names:
+        raise TypeError(f"{cls.__name__} got unexpected fields: {sorted(d.keys() - names)}")
+    obj = object.__new__(cls)
+    for name, default, factory in specs:
+        if name in d:
+            value = d[name]
+        elif factory is None:
+            value = default
+        else:
+            value = factory()
+        object.__setattr__(obj, name, value)
+    return obj
 
 
 # ── Project ─────────────────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class DroneProject:
     """A Drone2Twin pipeline project."""
     id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
@@ -165,9 +272,48 @@ class DroneProject:
     # Error info (if stage == FAILED)
     error: Optional[str] = None
 
+    # Stage → input fingerprint of its last successful run (see run_stage)
+    stage_fingerprints: dict = field(default_factory=dict)
+
+    # Last to_dict() result; dropped by invalidate_dict(), which the setters
+    # below call and the orchestrator calls after assigning fields directly
+    _dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate_dict(self):
+        """Drop the cached to_dict() result after changing the project."""
+        self._dict_cache = None
+
+    def set_artifact(self, key: str, value: Any):
+        """Set ``artifacts[key]``."""
+        self.artifacts[key] = value
+        self._dict_cache = None
+
+    def set_stage_fingerprint(self, stage: str, fingerprint: Optional[str]):
+        """Record *stage*'s input fingerprint (None drops it)."""
+        if fingerprint is None:
+            self.stage_fingerprints.pop(stage, None)
+        else:
+            self.stage_fingerprints[stage] = fingerprint
+        self._dict_cache = None
+
     def to_dict(self) -> dict:
-        """Serialize for JSON storage and API response."""
-        d = {
+        """Serialize for JSON storage and API response.
+
+        Rebuilt only after invalidate_dict(); each call gets its own
+        top-level dict, nested values are shared and must not be modified.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return dict(self._dict_cache)
+
+    def _build_dict(self) -> dict:
+        reports = (
+            ("qa_report", self.qa_report),
+            ("recon_report", self.recon_report),
+            ("optimize_report", self.optimize_report),
+            ("perf_report", self.perf_report),
+        )
+        return {
             "id": self.id,
             "name": self.name,
             "input_option": self.input_option.value,
@@ -177,43 +323,38 @@ class DroneProject:
             "run_id": self.run_id,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
-            "artifacts": self.artifacts,
+            "artifacts": copy.deepcopy(self.artifacts),
             "error": self.error,
+            "stage_fingerprints": dict(self.stage_fingerprints),
+            **{key: r.to_dict() for key, r in reports if r is not None},
         }
-        if self.qa_report:
-            d["qa_report"] = self.qa_report.to_dict()
-        if self.recon_report:
-            d["recon_report"] = self.recon_report.to_dict()
-        if self.optimize_report:
-            d["optimize_report"] = self.optimize_report.to_dict()
-        if self.perf_report:
-            d["perf_report"] = self.perf_report.to_dict()
-        return d
 
     @classmethod
     def from_dict(cls, d: dict) -> "DroneProject":
-        """Deserialize from JSON."""
-        proj = cls(
-            id=d.get("id", uuid.uuid4().hex[:12]),
-            name=d.get("name", ""),
-            input_option=InputOption(d.get("input_option", "vendor_pack")),
-            preset=Preset(d.get("preset", "preview")),
-            base_dir=d.get("base_dir", ""),
-            stage=PipelineStage(d.get("stage", "created")),
-            run_id=d.get("run_id", ""),
-            created_at=d.get("created_at", time.time()),
-            updated_at=d.get("updated_at", time.time()),
-            artifacts=d.get("artifacts", {}),
-            error=d.get("error"),
-        )
-        if "qa_report" in d and d["qa_report"]:
-            proj.qa_report = QAReport(**d["qa_report"])
-        if "recon_report" in d and d["recon_report"]:
-            proj.recon_report = ReconReport(**d["recon_report"])
-        if "optimize_report" in d and d["optimize_report"]:
-            proj.optimize_report = OptimizeReport(**d["optimize_report"])
-        if "perf_report" in d and d["perf_report"]:
-            proj.perf_report = PerfReport(**d["perf_report"])
+        """Deserialize from JSON (fields set directly, __init__ is bypassed)."""
+        proj = object.__new__(cls)
+        proj.id = d["id"] if "id" in d else uuid.uuid4().hex[:12]
+        proj.name = d.get("name", "")
+        proj.input_option = _INPUT_OPTION_BY_VALUE[d.get("input_option", "vendor_pack")]
+        proj.preset = _PRESET_BY_VALUE[d.get("preset", "preview")]
+        proj.base_dir = d.get("base_dir", "")
+        proj.stage = _PIPELINE_STAGE_BY_VALUE[d.get("stage", "created")]
+        proj.run_id = d.get("run_id", "")
+        proj.created_at = d["created_at"] if "created_at" in d else time.time()
+        proj.updated_at = d["updated_at"] if "updated_at" in d else time.time()
+        proj.artifacts = d.get("artifacts", {})
+        proj.error = d.get("error")
+        proj.stage_fingerprints = d.get("stage_fingerprints", {})
+        proj._dict_cache = None
+
+        qa = d.get("qa_report")
+        proj.qa_report = _report_from_dict(QAReport, qa) if qa else None
+        recon = d.get("recon_report")
+        proj.recon_report = _report_from_dict(ReconReport, recon) if recon else None
+        optimize = d.get("optimize_report")
+        proj.optimize_report = _report_from_dict(OptimizeReport, optimize) if optimize else None
+        perf = d.get("perf_report")
+        proj.perf_report = _report_from_dict(PerfReport, perf) if perf else None
         return proj
 
 
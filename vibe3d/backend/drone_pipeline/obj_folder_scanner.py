@@ -4,11 +4,15 @@ Scans a folder of OBJ tiles (e.g. Skyline city-view exports) and groups them
 by row/col, parses MTL for texture references, and reads vertex/face counts.
 """
 
+import functools
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable, Optional
 
+from . import json_io
 from .models import OBJTileInfo
 
 logger = logging.getLogger(__name__)
@@ -16,6 +20,123 @@ logger = logging.getLogger(__name__)
 # Regex for Skyline-style tile names: Tile-{row}-{col}-1-1
 _TILE_RE = re.compile(r"Tile-(\d+)-(\d+)")
 
+# OBJ header comment counts (matched against the lower-cased comment line)
+_VERTS_RE = re.compile(rb"vertices?\s*[:=]\s*(\d+)")
+_FACES_RE = re.compile(rb"faces?\s*[:=]\s*(\d+)")
+
+# MTL texture statements: "map_Kd path/to/texture.jpg" (any map_* keyword)
+_MTL_MAP_RE = re.compile(rb"^[ \t]*map_\S*[ \t]+(.+?)[ \t\r]*$", re.IGNORECASE | re.MULTILINE)
+
+# Header comments are read from this many leading bytes of each OBJ
+_OBJ_HEADER_BYTES = 8192
+
+# Size-based count estimate: a typical OBJ is ~60% vertex lines (~30 bytes
+# each) and ~40% face lines (~20 bytes each) → one of each per 50 bytes
+_BYTES_PER_VERT = 50    # 30 / 0.6
+_BYTES_PER_FACE = 50    # 20 / 0.4
+
+# Sidecar parse cache written into scanned folders
+OBJ_CACHE_FILENAME = ".vibe3d_objcache.json"
+_OBJ_CACHE_VERSION = 1
+
+# Per-tile parsing is I/O bound (header read, MTL parse, stats)
+_TILE_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+# Subfolder levels below each tile folder included in the stat map
+# (texture folders next to the OBJ/MTL files)
+_STAT_DEPTH = 1
+
+
+def _collect_stats(dirs: Iterable[str], depth: int = _STAT_DEPTH) -> dict[str, tuple[int, int]]:
+    """Map file path → (size, mtime_ns) for files in *dirs* and *depth* levels below.
+
+    Symlinks are not followed: linked directories are skipped and linked
+    files are left out, so _file_stat() resolves them with os.stat.
+    """
+    stats: dict[str, tuple[int, int]] = {}
+    stack = [(d, 0) for d in dirs]
+    seen: set[str] = set()
+    while stack:
+        current, level = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if level < depth:
+                            stack.append((entry.path, level + 1))
+                    elif not entry.is_symlink():
+                        st = entry.stat(follow_symlinks=False)
+                        stats[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+    return stats
+
+
+def _file_stat(stats: dict[str, tuple[int, int]], path: str) -> tuple[int, int]:
+    """(size, mtime_ns) from the scandir map, falling back to os.stat ((0, 0) if missing)."""
+    st = stats.get(path)
+    if st is not None:
+        return st
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0, 0
+    return st.st_size, st.st_mtime_ns
+
+
+def _file_size(stats: dict[str, tuple[int, int]], path: str) -> int:
+    """File size via _file_stat."""
+    return _file_stat(stats, path)[0]
+
+
+# ── Sidecar parse cache ──────────────────────────────────────
+# Per folder: OBJ header counts and raw MTL texture references, keyed on
+# each file's (size, mtime_ns). Texture paths are re-resolved every scan.
+
+def _empty_obj_cache() -> dict:
+    return {"objs": {}, "mtls": {}}
+
+
+def _load_obj_cache(folder: str) -> dict:
+    """Load the folder's parse cache (empty on miss, version mismatch or error)."""
+    try:
+        data = json_io.read_json(os.path.join(folder, OBJ_CACHE_FILENAME))
+    except FileNotFoundError:
+        return _empty_obj_cache()
+    except Exception as e:
+        logger.debug("Ignoring unreadable OBJ cache in %s: %s", folder, e)
+        return _empty_obj_cache()
+    if not isinstance(data, dict) or data.get("version") != _OBJ_CACHE_VERSION:
+        return _empty_obj_cache()
+    return {"objs": data.get("objs") or {}, "mtls": data.get("mtls") or {}}
+
+
+def _save_obj_cache(folder: str, cache: dict):
+    """Write the folder's parse cache via a temp file + rename (best effort; folder may be read-only)."""
+    try:
+        json_io.write_json(
+            os.path.join(folder, OBJ_CACHE_FILENAME),
+            {"version": _OBJ_CACHE_VERSION, **cache},
+            indent=False,
+            atomic=True,
+        )
+    except OSError as e:
+        logger.debug("Could not write OBJ cache in %s: %s", folder, e)
+
+
+def _cache_key(root: str, path: str) -> str:
+    """Cache key for *path*: relative to the scanned folder when inside it."""
+    prefix = root.rstrip(os.sep) + os.sep
+    return path[len(prefix):] if path.startswith(prefix) else path
+
 
 class OBJFolderScanner:
     """Scans OBJ tile folders and produces tile metadata."""
@@ -40,54 +161,37 @@ class OBJFolderScanner:
             # Also check one level deep
             obj_files = sorted(folder.glob("**/*.obj"))
 
+        # One scandir pass over the tile folders gives file sizes/mtimes;
+        # avoids a stat() per file
+        root = str(folder)
+        stats = _collect_stats({os.path.dirname(str(p)) for p in obj_files})
+
+        # Reuse header counts / MTL references of files unchanged since last scan.
+        # Workers only add distinct keys to new_cache.
+        old_cache = _load_obj_cache(root)
+        new_cache = _empty_obj_cache()
+
+        with ThreadPoolExecutor(max_workers=_TILE_IO_WORKERS) as pool:
+            results = list(pool.map(
+                functools.partial(
+                    self._process_one,
+                    stats=stats, root=root, old_cache=old_cache, new_cache=new_cache,
+                ),
+                map(str, obj_files),
+            ))
+
+        if new_cache != old_cache:
+            _save_obj_cache(root, new_cache)
+
+        # Tiles often share textures: size each unique texture once
+        tex_sizes = {
+            tex: _file_size(stats, tex)
+            for tex in set().union(*(fields["texture_paths"] for fields, _ in results))
+        }
         tiles: list[OBJTileInfo] = []
-
-        for obj_path in obj_files:
-            m = _TILE_RE.search(obj_path.stem)
-            row = int(m.group(1)) if m else 0
-            col = int(m.group(2)) if m else 0
-
-            tile = OBJTileInfo(
-                name=obj_path.stem,
-                row=row,
-                col=col,
-                obj_path=str(obj_path),
-            )
-
-            # Look for matching MTL
-            mtl_path = obj_path.with_suffix(".mtl")
-            if mtl_path.exists():
-                tile.mtl_path = str(mtl_path)
-                tile.texture_paths = self._parse_mtl_textures(mtl_path)
-            else:
-                # Try common alternative names
-                for alt in [obj_path.stem + ".mtl", obj_path.stem.lower() + ".mtl"]:
-                    alt_path = obj_path.parent / alt
-                    if alt_path.exists():
-                        tile.mtl_path = str(alt_path)
-                        tile.texture_paths = self._parse_mtl_textures(alt_path)
-                        break
-
-            # Read vertex/face counts from OBJ header comments
-            verts, faces = self._read_obj_counts(obj_path)
-            tile.vertex_count = verts
-            tile.face_count = faces
-
-            # Calculate total size (OBJ + MTL + textures)
-            total_bytes = obj_path.stat().st_size
-            if tile.mtl_path:
-                try:
-                    total_bytes += Path(tile.mtl_path).stat().st_size
-                except OSError:
-                    pass
-            for tex in tile.texture_paths:
-                try:
-                    total_bytes += Path(tex).stat().st_size
-                except OSError:
-                    pass
-            tile.size_mb = round(total_bytes / (1024 * 1024), 2)
-
-            tiles.append(tile)
+        for fields, own_bytes in results:
+            total_bytes = own_bytes + sum(tex_sizes[tex] for tex in fields["texture_paths"])
+            tiles.append(OBJTileInfo(**fields, size_mb=round(total_bytes / (1024 * 1024), 2)))
 
         # Sort by row, then col
         tiles.sort(key=lambda t: (t.row, t.col))
@@ -152,76 +256,151 @@ class OBJFolderScanner:
 
     # ── Internal helpers ──────────────────────────────────────
 
-    def _parse_mtl_textures(self, mtl_path: Path) -> list[str]:
-        """Parse MTL file and extract texture paths (map_Kd etc.)."""
-        textures: list[str] = []
-        parent = mtl_path.parent
+    def _process_one(
+        self,
+        obj_path: str,
+        stats: dict[str, tuple[int, int]],
+        root: str,
+        old_cache: dict,
+        new_cache: dict,
+    ) -> tuple[dict, int]:
+        """Collect OBJTileInfo fields for one OBJ file (runs in the scan thread pool).
+
+        Works on plain path strings; tile paths are stored as str anyway.
+        Returns the fields and the OBJ + MTL byte count; scan() adds texture
+        sizes and builds the (frozen) OBJTileInfo.
+        """
+        base = obj_path[:-4]                          # strip ".obj"
+        stem = os.path.basename(base)
+        m = _TILE_RE.search(stem)
+        row = int(m.group(1)) if m else 0
+        col = int(m.group(2)) if m else 0
+
+        tile = {
+            "name": stem,
+            "row": row,
+            "col": col,
+            "obj_path": obj_path,
+            "mtl_path": "",
+            "texture_paths": (),
+        }
+
+        mtl_size = 0
+
+        # Look for matching MTL (same name, then lower-cased name)
+        candidates = [base + ".mtl"]
+        lower_mtl = os.path.join(os.path.dirname(obj_path), stem.lower() + ".mtl")
+        if lower_mtl != candidates[0]:
+            candidates.append(lower_mtl)
+        for mtl_path in candidates:
+            if mtl_path in stats or os.path.exists(mtl_path):
+                tile["mtl_path"] = mtl_path
+                mtl_size, mtl_mtime = _file_stat(stats, mtl_path)
+                key = _cache_key(root, mtl_path)
+                hit = old_cache["mtls"].get(key)
+                if hit and hit[0] == mtl_size and hit[1] == mtl_mtime:
+                    refs = hit[2]
+                else:
+                    refs = self._read_mtl_refs(mtl_path)
+                new_cache["mtls"][key] = [mtl_size, mtl_mtime, refs]
+                tile["texture_paths"] = tuple(self._resolve_textures(mtl_path, refs, stats))
+                break
+
+        # Read vertex/face counts from OBJ header comments
+        obj_size, obj_mtime = _file_stat(stats, obj_path)
+        key = _cache_key(root, obj_path)
+        hit = old_cache["objs"].get(key)
+        if hit and hit[0] == obj_size and hit[1] == obj_mtime:
+            verts, faces = hit[2], hit[3]
+        else:
+            verts, faces = self._read_obj_counts(obj_path, obj_size)
+        new_cache["objs"][key] = [obj_size, obj_mtime, verts, faces]
+        tile["vertex_count"] = verts
+        tile["face_count"] = faces
+
+        return tile, obj_size + mtl_size
+
+    def _read_mtl_refs(self, mtl_path: str) -> list[str]:
+        """Read raw texture references (map_Kd etc.) from an MTL file."""
+        refs: list[str] = []
         try:
-            with open(mtl_path, "r", encoding="utf-8", errors="replace") as f:
-                for line in f:
-                    line = line.strip()
-                    # map_Kd, map_Ka, map_Ks, map_Bump, etc.
-                    if line.lower().startswith("map_"):
-                        parts = line.split(None, 1)
-                        if len(parts) >= 2:
-                            tex_rel = parts[1].strip()
-                            # Resolve relative to MTL location
-                            tex_abs = parent / tex_rel
-                            if tex_abs.exists():
-                                textures.append(str(tex_abs))
-                            else:
-                                # Try just filename in same folder
-                                tex_name = Path(tex_rel).name
-                                tex_alt = parent / tex_name
-                                if tex_alt.exists():
-                                    textures.append(str(tex_alt))
+            with open(mtl_path, "rb") as f:
+                data = f.read()
+            # map_Kd, map_Ka, map_Ks, map_Bump, etc.
+            for match in _MTL_MAP_RE.findall(data):
+                tex_rel = match.decode("utf-8", errors="replace").strip()
+                if tex_rel:
+                    refs.append(tex_rel)
         except Exception as e:
             logger.debug("Failed to parse MTL %s: %s", mtl_path, e)
+        return refs
+
+    def _resolve_textures(
+        self, mtl_path: str, refs: list[str], stats: dict[str, tuple[int, int]],
+    ) -> list[str]:
+        """Resolve MTL texture references to existing files."""
+        textures: list[str] = []
+        parent = Path(mtl_path).parent
+        for tex_rel in refs:
+            # Resolve relative to MTL location
+            tex_abs = str(parent / tex_rel)
+            if tex_abs in stats or os.path.exists(tex_abs):
+                textures.append(tex_abs)
+            else:
+                # Try just filename in same folder
+                tex_alt = str(parent / Path(tex_rel).name)
+                if tex_alt in stats or os.path.exists(tex_alt):
+                    textures.append(tex_alt)
 
-        return list(set(textures))  # dedupe
+        return list(dict.fromkeys(textures))  # dedupe, keeping MTL order
 
-    def _read_obj_counts(self, obj_path: Path) -> tuple[int, int]:
+    def _read_obj_counts(self, obj_path: str, size: Optional[int] = None) -> tuple[int, int]:
         """Read vertex/face counts from OBJ file.
 
-        First tries header comments (fast), then falls back to counting
-        v/f lines in the first portion of the file.
+        First tries header comments in the first 8 KB (fast), then falls
+        back to an estimate from the file size.
         """
         verts = 0
         faces = 0
 
         try:
-            with open(obj_path, "r", encoding="utf-8", errors="replace") as f:
-                # Read up to 200 header lines for comments
-                for i, line in enumerate(f):
-                    if i > 200:
-                        break
-                    line = line.strip()
-
-                    # Skyline-style comments: # Vertices: 123456
-                    if line.startswith("#"):
-                        low = line.lower()
-                        m_v = re.search(r"vertices?\s*[:=]\s*(\d+)", low)
+            # Header comments live at the top: one raw read, no text decoding
+            with open(obj_path, "rb") as f:
+                head = f.read(_OBJ_HEADER_BYTES)
+            if len(head) == _OBJ_HEADER_BYTES:
+                # Drop the trailing partial line so a count is never cut short
+                head = head[:head.rfind(b"\n") + 1]
+
+            # Look at up to 200 header lines for comments
+            for line in head.split(b"\n", 201)[:201]:
+                line = line.strip()
+
+                # Skyline-style comments: # Vertices: 123456
+                if line.startswith(b"#"):
+                    low = line.lower()
+                    if b"vert" in low:
+                        m_v = _VERTS_RE.search(low)
                         if m_v:
                             verts = int(m_v.group(1))
-                        m_f = re.search(r"faces?\s*[:=]\s*(\d+)", low)
+                    if b"face" in low:
+                        m_f = _FACES_RE.search(low)
                         if m_f:
                             faces = int(m_f.group(1))
 
-                    # If we found counts in comments, stop early
-                    if verts > 0 and faces > 0:
-                        return verts, faces
+                # If we found counts in comments, stop early
+                if verts > 0 and faces > 0:
+                    return verts, faces
 
-                    # If we hit actual data, switch to counting
-                    if line.startswith("v ") or line.startswith("f "):
-                        break
+                # If we hit actual data, switch to counting
+                if line.startswith(b"v ") or line.startswith(b"f "):
+                    break
 
             # Fallback: estimate from file size (rough heuristic)
-            # Typical OBJ: ~30 bytes/vertex line, ~20 bytes/face line
             if verts == 0:
-                size = obj_path.stat().st_size
-                # Rough 60/40 split between vertex and face data
-                verts = int(size * 0.6 / 30)
-                faces = int(size * 0.4 / 20)
+                if size is None:
+                    size = os.stat(obj_path).st_size
+                verts = size // _BYTES_PER_VERT
+                faces = size // _BYTES_PER_FACE
 
         except Exception as e:
             logger.debug("Failed to read OBJ counts for %s: %s", obj_path, e)
@@ -6,15 +6,21 @@ when Blender is not installed.
 """
 
 import asyncio
+import atexit
+import hashlib
 import json
 import logging
 import os
 import shutil
+import tempfile
 import time
+from collections import deque
 from pathlib import Path
 from typing import Callable, Optional
 
 from .. import config
+from . import json_io
+from ._procgroup import DRAIN_GRACE_SECONDS, SPAWN_KWARGS, terminate_process_group, wait_exit
 from .models import OptimizeReport, Preset
 
 logger = logging.getLogger(__name__)
@@ -27,12 +33,14 @@ LOD_PRESETS = {
         "lod1": 30_000,
         "lod2": 10_000,
         "texture_max": 2048,
+        "noise_min_faces": 50_000,   # skip noise removal below this
     },
     Preset.PRODUCTION: {
         "lod0": 300_000,
         "lod1": 80_000,
         "lod2": 20_000,
         "texture_max": 4096,
+        "noise_min_faces": 200_000,
     },
 }
 
@@ -46,7 +54,6 @@ BLENDER_OPTIMIZE_SCRIPT = r'''
 Usage: blender --background --python this_script.py -- <input_mesh> <output_dir> <preset_json>
 """
 import bpy
-import bmesh
 import json
 import os
 import sys
@@ -101,49 +108,43 @@ original_faces = len(active.data.polygons)
 print(f"Input: {original_faces} faces")
 
 # ── 3. Remove noise (small disconnected pieces) ─────────
-bm = bmesh.new()
-bm.from_mesh(active.data)
-bm.verts.ensure_lookup_table()
-
-# Find connected components, remove those with < 100 vertices
-# Using linked flat faces as a simple heuristic
-removed_verts = 0
-islands = []
-visited = set()
-
-for v in bm.verts:
-    if v.index in visited:
-        continue
-    island = set()
-    stack = [v]
-    while stack:
-        cv = stack.pop()
-        if cv.index in visited:
+# Split loose parts into separate objects (C-level), drop those with
+# < noise_threshold vertices and join the rest back together.
+noise_min_faces = preset.get("noise_min_faces", 50_000)
+if original_faces >= noise_min_faces:
+    removed_verts = 0
+    noise_threshold = max(100, original_faces // 1000)
+
+    bpy.ops.object.select_all(action='DESELECT')
+    active.select_set(True)
+    bpy.context.view_layer.objects.active = active
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.mesh.select_all(action='SELECT')
+    bpy.ops.mesh.separate(type='LOOSE')
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    pieces = [o for o in bpy.context.selected_objects if o.type == 'MESH']
+    pieces.sort(key=lambda o: len(o.data.vertices), reverse=True)
+    keep = [o for o in pieces if len(o.data.vertices) >= noise_threshold] or pieces[:1]
+    keep_set = set(keep)
+    for piece in pieces:
+        if piece in keep_set:
             continue
-        visited.add(cv.index)
-        island.add(cv.index)
-        for e in cv.link_edges:
-            ov = e.other_vert(cv)
-            if ov.index not in visited:
-                stack.append(ov)
-    islands.append(island)
-
-# Remove small islands
-noise_threshold = max(100, original_faces // 1000)
-for island in islands:
-    if len(island) < noise_threshold:
-        for vi in island:
-            bm.verts.ensure_lookup_table()
-            try:
-                bm.verts.remove(bm.verts[vi])
-            except (IndexError, ReferenceError):
-                pass
-            removed_verts += 1
+        removed_verts += len(piece.data.vertices)
+        mesh = piece.data
+        bpy.data.objects.remove(piece, do_unlink=True)
+        bpy.data.meshes.remove(mesh)
 
-bm.to_mesh(active.data)
-bm.free()
-active.data.update()
-print(f"Noise removal: removed {removed_verts} vertices from {len(islands)} islands")
+    bpy.ops.object.select_all(action='DESELECT')
+    for piece in keep:
+        piece.select_set(True)
+    bpy.context.view_layer.objects.active = keep[0]
+    if len(keep) > 1:
+        bpy.ops.object.join()
+    active = bpy.context.active_object
+    print(f"Noise removal: removed {removed_verts} vertices from {len(pieces)} islands")
+else:
+    print(f"Noise removal: skipped ({original_faces} faces < {noise_min_faces})")
 
 # ── 4. Fill holes ────────────────────────────────────────
 bpy.ops.object.mode_set(mode='EDIT')
@@ -166,14 +167,20 @@ report = {
 
 current_faces = len(active.data.polygons)
 
-for lod_name in ("lod0", "lod1", "lod2"):
+# Hierarchical LODs: each level is decimated from the previous (already
+# reduced) level instead of from the full mesh, highest target first.
+lod_names = sorted(("lod0", "lod1", "lod2"), key=lambda n: preset[n], reverse=True)
+source = active
+source_faces = current_faces
+
+for lod_name in lod_names:
     target = preset[lod_name]
-    ratio = min(1.0, target / max(current_faces, 1))
+    ratio = min(1.0, target / max(source_faces, 1))
 
-    # Duplicate for this LOD
+    # Duplicate the previous level for this LOD
     bpy.ops.object.select_all(action='DESELECT')
-    active.select_set(True)
-    bpy.context.view_layer.objects.active = active
+    source.select_set(True)
+    bpy.context.view_layer.objects.active = source
     bpy.ops.object.duplicate()
     lod_obj = bpy.context.active_object
     lod_obj.name = f"mesh_{lod_name}"
@@ -198,8 +205,14 @@ for lod_name in ("lod0", "lod1", "lod2"):
     report["output_files"].append(out_path)
     print(f"{lod_name}: {lod_faces} faces → {out_path}")
 
-    # Remove duplicate
-    bpy.data.objects.remove(lod_obj, do_unlink=True)
+    # The previous level is no longer needed once the next is derived
+    if source is not active:
+        bpy.data.objects.remove(source, do_unlink=True)
+    source = lod_obj
+    source_faces = lod_faces
+
+if source is not active:
+    bpy.data.objects.remove(source, do_unlink=True)
 
 # Decimation ratio (LOD0 vs original)
 lod0_count = report["output_polycounts"].get("lod0", current_faces)
@@ -207,15 +220,13 @@ report["decimation_ratio"] = round(lod0_count / max(original_faces, 1), 3)
 
 # ── 6. Resize textures ──────────────────────────────────
 tex_max = preset.get("texture_max", 2048)
+# Scale oversized images first, then report every image's final size
 for img in bpy.data.images:
-    if img.size[0] > tex_max or img.size[1] > tex_max:
-        scale = tex_max / max(img.size[0], img.size[1])
-        new_w = int(img.size[0] * scale)
-        new_h = int(img.size[1] * scale)
-        img.scale(new_w, new_h)
-        report["texture_sizes"].append(f"{new_w}x{new_h}")
-    else:
-        report["texture_sizes"].append(f"{img.size[0]}x{img.size[1]}")
+    w, h = img.size
+    if w > tex_max or h > tex_max:
+        scale = tex_max / max(w, h)
+        img.scale(int(w * scale), int(h * scale))
+report["texture_sizes"] = [f"{img.size[0]}x{img.size[1]}" for img in bpy.data.images]
 
 # ── 7. Write report ─────────────────────────────────────
 report["elapsed_seconds"] = round(time.time() - start_time, 1)
@@ -228,6 +239,74 @@ print(f"Report: {report_path}")
 '''
 
 
+# The script is written once per process to a private mkstemp file (O_EXCL,
+# mode 0600) and re-hashed before every run, so Blender never executes a
+# file this process did not write
+_SCRIPT_BYTES = BLENDER_OPTIMIZE_SCRIPT.encode("utf-8")
+_SCRIPT_DIGEST = hashlib.sha256(_SCRIPT_BYTES).digest()
+_SCRIPT_PATH: Optional[str] = None
+
+
+def _script_intact(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).digest() == _SCRIPT_DIGEST
+    except OSError:
+        return False
+
+
+def _remove_script():
+    if _SCRIPT_PATH is not None:
+        try:
+            os.remove(_SCRIPT_PATH)
+        except OSError:
+            pass
+
+
+def _ensure_script_path() -> str:
+    """Return this process's copy of BLENDER_OPTIMIZE_SCRIPT, writing it if needed.
+
+    A missing or modified copy is replaced by a fresh mkstemp file.
+    """
+    global _SCRIPT_PATH
+    if _SCRIPT_PATH is not None and _script_intact(_SCRIPT_PATH):
+        return _SCRIPT_PATH
+
+    fd, path = tempfile.mkstemp(prefix="vibe3d_optimize_", suffix=".py")
+    with os.fdopen(fd, "wb") as f:
+        f.write(_SCRIPT_BYTES)
+    if _SCRIPT_PATH is None:
+        atexit.register(_remove_script)
+    else:
+        logger.warning("Blender script %s changed or vanished, rewriting", _SCRIPT_PATH)
+    _SCRIPT_PATH = path
+    return path
+
+
+# Blender logs a line per LOD/image; keep only the start and end of its output
+_LOG_HEAD_LINES = 50
+_LOG_TAIL_LINES = 200
+
+
+async def _drain_lines(stream: asyncio.StreamReader, head: list[bytes], tail: deque):
+    """Read *stream* to EOF, keeping the first and last lines only."""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:  # over-long line, already discarded by the reader
+            continue
+        if not line:
+            break
+        if len(head) < _LOG_HEAD_LINES:
+            head.append(line)
+        else:
+            tail.append(line)
+
+
+def _joined_lines(head: list[bytes], tail: deque) -> str:
+    return b"".join([*head, *tail]).decode("utf-8", errors="replace")
+
+
 class BlenderOptimizeEngine:
     """Mesh optimization using Blender CLI (headless)."""
 
@@ -301,8 +380,7 @@ class BlenderOptimizeEngine:
 
         # Save report
         report_path = out / "optimize_report.json"
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+        json_io.write_json(report_path, report.to_dict())
 
         logger.info("Stub optimize complete: %s → %s (%.1f MB)", inp.name, lod0_path, size_mb)
         return report
@@ -318,67 +396,74 @@ class BlenderOptimizeEngine:
         start_time: float,
     ) -> OptimizeReport:
         """Run full Blender optimization pipeline."""
-        import tempfile
-
         lod_preset = LOD_PRESETS[preset]
         preset_json = json.dumps(lod_preset)
+        script_path = _ensure_script_path()
 
-        # Write Blender script to temp file
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".py", delete=False, encoding="utf-8",
-        ) as f:
-            f.write(BLENDER_OPTIMIZE_SCRIPT)
-            script_path = f.name
+        if progress_cb:
+            await progress_cb("optimization", 0.1)
 
-        try:
-            if progress_cb:
-                await progress_cb("optimization", 0.1)
+        logger.info("Running Blender optimization: %s → %s (preset: %s)", input_mesh, output_dir, preset.value)
 
-            logger.info("Running Blender optimization: %s → %s (preset: %s)", input_mesh, output_dir, preset.value)
+        proc = await asyncio.create_subprocess_exec(
+            self._blender_path, "--background", "--python", script_path,
+            "--", input_mesh, output_dir, preset_json,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **SPAWN_KWARGS,
+        )
 
-            proc = await asyncio.create_subprocess_exec(
-                self._blender_path, "--background", "--python", script_path,
-                "--", input_mesh, output_dir, preset_json,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+        # Stream both pipes into bounded buffers instead of communicate()
+        out_head: list[bytes] = []
+        out_tail: deque = deque(maxlen=_LOG_TAIL_LINES)
+        err_head: list[bytes] = []
+        err_tail: deque = deque(maxlen=_LOG_TAIL_LINES)
+        drains = asyncio.gather(
+            _drain_lines(proc.stdout, out_head, out_tail),
+            _drain_lines(proc.stderr, err_head, err_tail),
+        )
+        try:
+            await wait_exit(proc, 1800)  # 30min timeout
+        except BaseException:
+            # Timeout or cancellation: stop Blender (and anything it spawned)
+            # before unwinding
+            if proc.returncode is None:
+                logger.warning("Stopping Blender optimization (pid %d)", proc.pid)
+                await terminate_process_group(proc)
+            raise
+        finally:
+            try:
+                await asyncio.wait_for(drains, timeout=DRAIN_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                logger.debug("Blender output pipes still open after exit — not drained")
+
+        if proc.returncode != 0:
+            err_msg = _joined_lines(err_head, err_tail)[:500]
+            logger.error("Blender failed (rc=%d): %s", proc.returncode, err_msg)
+            logger.debug("Blender stdout:\n%s", _joined_lines(out_head, out_tail))
+            return OptimizeReport(
+                blender_available=True,
+                elapsed_seconds=round(time.time() - start_time, 1),
+                warnings=[f"Blender exited with code {proc.returncode}: {err_msg}"],
             )
 
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=1800)  # 30min timeout
-
-            if proc.returncode != 0:
-                err_msg = stderr.decode("utf-8", errors="replace")[:500]
-                logger.error("Blender failed (rc=%d): %s", proc.returncode, err_msg)
-                return OptimizeReport(
-                    blender_available=True,
-                    elapsed_seconds=round(time.time() - start_time, 1),
-                    warnings=[f"Blender exited with code {proc.returncode}: {err_msg}"],
-                )
-
-            if progress_cb:
-                await progress_cb("optimization", 0.9)
-
-            # Read report generated by Blender script
-            report_path = Path(output_dir) / "optimize_report.json"
-            if report_path.exists():
-                with open(report_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                report = OptimizeReport(**data)
-            else:
-                report = OptimizeReport(
-                    blender_available=True,
-                    elapsed_seconds=round(time.time() - start_time, 1),
-                    warnings=["Blender completed but no report file generated"],
-                )
-
-            if progress_cb:
-                await progress_cb("optimization", 1.0)
-
-            logger.info("Blender optimization complete in %.1fs", report.elapsed_seconds)
-            return report
+        if progress_cb:
+            await progress_cb("optimization", 0.9)
+
+        # Read report generated by Blender script
+        report_path = Path(output_dir) / "optimize_report.json"
+        if report_path.exists():
+            data = json_io.read_json(report_path)
+            report = OptimizeReport(**data)
+        else:
+            report = OptimizeReport(
+                blender_available=True,
+                elapsed_seconds=round(time.time() - start_time, 1),
+                warnings=["Blender completed but no report file generated"],
+            )
 
-        finally:
-            # Clean up temp script
-            try:
-                os.unlink(script_path)
-            except OSError:
-                pass
+        if progress_cb:
+            await progress_cb("optimization", 1.0)
+
+        logger.info("Blender optimization complete in %.1fs", report.elapsed_seconds)
+        return report
@@ -4,11 +4,13 @@ Analyzes build output to estimate loading times and identify
 potential performance issues.
 """
 
-import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
+from . import _fastwalk, json_io
 from .models import PerfReport
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,9 @@ SPEED_3G = 125_000        # 1 Mbps
 SPEED_4G = 1_250_000      # 10 Mbps
 SPEED_WIFI = 6_250_000    # 50 Mbps
 
+# bytes → MB; 2**-20 is exact, so multiplying matches dividing bit for bit
+INV_MB = 1.0 / (1024 * 1024)
+
 # ── Thresholds ───────────────────────────────────────────────
 
 WARN_TOTAL_MB = 50        # warn if total build > 50MB
@@ -26,6 +31,105 @@ WARN_WASM_MB = 20         # warn if .wasm > 20MB
 WARN_DATA_MB = 30         # warn if .data > 30MB
 WARN_LOAD_3G_SEC = 60     # warn if 3G load > 60s
 
+# ── File classification ──────────────────────────────────────
+
+# Matched against the lower-cased file name, so compressed Unity outputs
+# (".wasm.br", ".data.gz", ...) land in the right bucket
+WASM_EXTS = (".wasm", ".wasm.br", ".wasm.gz")
+DATA_EXTS = (".data", ".data.br", ".data.gz")
+JS_EXTS = (".js", ".js.br", ".js.gz")
+TEX_EXTS = (".ktx2", ".basis")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")     # counted as textures under a "texture" path
+LOD_EXTS = (".glb", ".gltf", ".fbx")
+
+# Threads for walking top-level build subtrees
+_WALK_WORKERS = 4
+
+
+def _scandir_files(path: str) -> Iterator[tuple[str, str, int]]:
+    """Yield (name, path, size) for files under *path* (symlinked dirs are not followed, like rglob).
+
+    DirEntry caches the type from the directory read, so each file costs one
+    stat for its size (none on Windows, where scandir returns it). Files
+    removed or locked mid-walk are skipped.
+    """
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _scandir_files(entry.path)
+                    elif entry.is_file():
+                        yield entry.name, entry.path, entry.stat().st_size
+                except OSError:
+                    continue
+    except PermissionError:
+        return
+
+
+# Bulk enumeration (getattrlistbulk on macOS) when available
+_walk_files = _fastwalk.walk_files or _scandir_files
+
+
+def _split_top_level(root: str) -> tuple[list[tuple[str, str, int]], list[str]]:
+    """Split *root*'s children into (name, path, size) files and (non-symlink) directory paths."""
+    files: list[tuple[str, str, int]] = []
+    dirs: list[str] = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append((entry.name, entry.path, entry.stat().st_size))
+                except OSError:
+                    continue
+    except PermissionError:
+        pass
+    return files, dirs
+
+
+def _tally(files: Iterable[tuple[str, str, int]]) -> tuple[int, int, int, int, int, int]:
+    """Return (total, wasm, data, js bytes, texture count, LOD count) for (name, path, size) *files*."""
+    total_bytes = 0
+    wasm_bytes = 0
+    data_bytes = 0
+    js_bytes = 0
+    texture_count = 0
+    lod_count = 0
+
+    # Hot loop: bind callables and extension tuples to locals
+    endswith = str.endswith
+    wasm_exts, data_exts, js_exts = WASM_EXTS, DATA_EXTS, JS_EXTS
+    tex_exts, image_exts, lod_exts = TEX_EXTS, IMAGE_EXTS, LOD_EXTS
+
+    for name, path, size in files:
+        total_bytes += size
+        name = name.lower()
+
+        if endswith(name, wasm_exts):
+            wasm_bytes += size
+        elif endswith(name, data_exts):
+            data_bytes += size
+        elif endswith(name, js_exts):
+            js_bytes += size
+        elif endswith(name, tex_exts):
+            texture_count += 1
+        elif endswith(name, image_exts) and "texture" in path.lower():
+            texture_count += 1
+
+        # LOD files
+        if endswith(name, lod_exts) and "lod" in name[:name.rfind(".")]:
+            lod_count += 1
+
+    return total_bytes, wasm_bytes, data_bytes, js_bytes, texture_count, lod_count
+
+
+def _scan_subtree(path: str) -> tuple[int, int, int, int, int, int]:
+    """_tally over every file under *path* (runs in the walk thread pool)."""
+    return _tally(_walk_files(path))
+
 
 class PerfReporter:
     """Analyze WebGL build output for performance metrics."""
@@ -38,46 +142,28 @@ class PerfReporter:
 
         report = PerfReport()
 
-        # Scan all files
-        total_bytes = 0
-        wasm_bytes = 0
-        data_bytes = 0
-        js_bytes = 0
-        texture_count = 0
-        lod_count = 0
-
-        for f in build.rglob("*"):
-            if not f.is_file():
-                continue
-            size = f.stat().st_size
-            total_bytes += size
-            ext = f.suffix.lower()
-
-            if ext == ".wasm" or ext == ".wasm.br" or ext == ".wasm.gz":
-                wasm_bytes += size
-            elif ext == ".data" or ext == ".data.br" or ext == ".data.gz":
-                data_bytes += size
-            elif ext in (".js", ".js.br", ".js.gz"):
-                js_bytes += size
-            elif ext in (".ktx2", ".basis"):
-                texture_count += 1
-            elif ext in (".png", ".jpg", ".jpeg") and "texture" in str(f).lower():
-                texture_count += 1
-
-            # LOD files
-            if "lod" in f.stem.lower() and ext in (".glb", ".gltf", ".fbx"):
-                lod_count += 1
+        # Top-level subtrees (Build/, TemplateData/, StreamingAssets/) are
+        # walked in parallel; scandir/stat release the GIL
+        top_files, top_dirs = _split_top_level(str(build))
+        if len(top_dirs) > 1:
+            with ThreadPoolExecutor(max_workers=_WALK_WORKERS) as pool:
+                parts = list(pool.map(_scan_subtree, top_dirs))
+        else:
+            parts = [_scan_subtree(d) for d in top_dirs]
+        (total_bytes, wasm_bytes, data_bytes, js_bytes,
+         texture_count, lod_count) = map(sum, zip(_tally(top_files), *parts))
 
         # Size metrics (MB)
-        report.total_size_mb = round(total_bytes / (1024 * 1024), 1)
-        report.wasm_size_mb = round(wasm_bytes / (1024 * 1024), 1)
-        report.data_size_mb = round(data_bytes / (1024 * 1024), 1)
-        report.js_size_mb = round(js_bytes / (1024 * 1024), 1)
+        report.total_size_mb = round(total_bytes * INV_MB, 1)
+        report.wasm_size_mb = round(wasm_bytes * INV_MB, 1)
+        report.data_size_mb = round(data_bytes * INV_MB, 1)
+        report.js_size_mb = round(js_bytes * INV_MB, 1)
         report.texture_count = texture_count
         report.lod_files = lod_count
 
         # Loading time estimates
-        report.estimated_load_time_3g = self._format_time(total_bytes / SPEED_3G)
+        load_3g_sec = total_bytes / SPEED_3G
+        report.estimated_load_time_3g = self._format_time(load_3g_sec)
         report.estimated_load_time_4g = self._format_time(total_bytes / SPEED_4G)
         report.estimated_load_time_wifi = self._format_time(total_bytes / SPEED_WIFI)
 
@@ -97,10 +183,9 @@ class PerfReporter:
                 f"Data file {report.data_size_mb}MB exceeds {WARN_DATA_MB}MB — "
                 "use Addressables to split data loading"
             )
-        load_3g_sec = total_bytes / SPEED_3G
         if load_3g_sec > WARN_LOAD_3G_SEC:
             report.warnings.append(
-                f"Estimated 3G load time {self._format_time(load_3g_sec)} exceeds {WARN_LOAD_3G_SEC}s — "
+                f"Estimated 3G load time {report.estimated_load_time_3g} exceeds {WARN_LOAD_3G_SEC}s — "
                 "optimize for mobile users"
             )
         if texture_count == 0 and report.data_size_mb > 5:
@@ -108,13 +193,14 @@ class PerfReporter:
                 "No KTX2/Basis textures found — consider texture compression for WebGL"
             )
 
-        logger.info(
-            "PerfReport: %.1fMB total (wasm=%.1f, data=%.1f, js=%.1f), "
-            "%d textures, %d LODs, WiFi load ~%s",
-            report.total_size_mb, report.wasm_size_mb, report.data_size_mb,
-            report.js_size_mb, texture_count, lod_count,
-            report.estimated_load_time_wifi,
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "PerfReport: %.1fMB total (wasm=%.1f, data=%.1f, js=%.1f), "
+                "%d textures, %d LODs, WiFi load ~%s",
+                report.total_size_mb, report.wasm_size_mb, report.data_size_mb,
+                report.js_size_mb, texture_count, lod_count,
+                report.estimated_load_time_wifi,
+            )
         return report
 
     def generate_report_file(self, build_dir: str, report: PerfReport, output_dir: Optional[str] = None):
@@ -123,8 +209,7 @@ class PerfReporter:
         out.mkdir(parents=True, exist_ok=True)
         path = out / "webgl_perf_report.json"
 
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+        json_io.write_json(path, report.to_dict())
 
         logger.info("Performance report saved: %s", path)
         return str(path)
@@ -132,10 +217,10 @@ class PerfReporter:
     @staticmethod
     def _format_time(seconds: float) -> str:
         """Format seconds into human-readable string."""
-        if seconds < 1:
+        s = int(seconds)
+        if s < 1:
             return "<1s"
-        if seconds < 60:
-            return f"{int(seconds)}s"
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
+        if s < 60:
+            return f"{s}s"
+        minutes, secs = divmod(s, 60)
         return f"{minutes}m{secs}s"
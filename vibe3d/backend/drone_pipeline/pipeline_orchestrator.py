@@ -5,14 +5,16 @@ State machine that manages project lifecycle and executes pipeline stages
 """
 
 import asyncio
-import json
+import hashlib
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterator, Optional, Union
 
 from .. import config
+from . import json_io, state_io
 from .models import (
     DroneProject,
     InputOption,
@@ -31,6 +33,82 @@ from .deployment import DeploymentManager
 
 logger = logging.getLogger(__name__)
 
+# Project metadata files in the data directory
+_STATE_FILE_SUFFIXES = (".msgpack", ".json")
+
+# Threads reading project files at startup
+_LOAD_WORKERS = 4
+
+# Input meshes looked up by _find_input_mesh / optimized meshes for Unity import
+MESH_EXTS = frozenset({".glb", ".gltf", ".fbx", ".obj", ".ply"})
+_OPTIMIZED_MESH_EXTS = frozenset({".glb", ".gltf", ".fbx", ".obj"})
+
+
+def _read_bytes(path: str) -> Union[bytes, OSError]:
+    """Read a whole file; the OSError is returned instead of raised (for pool.map)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        return e
+
+
+def _iter_mesh_files(directory: str, exts: frozenset) -> Iterator[str]:
+    """Yield paths of files in *directory* whose lower-cased extension is in *exts*."""
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if os.path.splitext(entry.name.lower())[1] in exts and entry.is_file():
+                    yield entry.path
+    except (FileNotFoundError, NotADirectoryError):
+        return
+
+
+class _BatchedBroadcaster:
+    """Coalesce high-rate progress events into batched WebSocket frames.
+
+    Items pushed within *max_delay* seconds (or up to *max_items*) are sent
+    as one ``event`` frame with ``{"items": [...]}``. Batches go out in order;
+    flush() sends anything pending and waits for delivery.
+    """
+
+    def __init__(self, broadcast: Callable, event: str, *, max_items: int = 16, max_delay: float = 0.05):
+        self._broadcast = broadcast
+        self._event = event
+        self._max_items = max_items
+        self._max_delay = max_delay
+        self._items: list[dict] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Optional[asyncio.Future] = None
+
+    def push(self, data: dict):
+        """Queue one item (must be called from the event loop)."""
+        self._items.append(data)
+        if len(self._items) >= self._max_items:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self._max_delay, self._start_flush)
+
+    async def flush(self):
+        """Send pending items and wait until every batch has been broadcast."""
+        self._start_flush()
+        if self._sending is not None:
+            await self._sending
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        items, self._items = self._items, []
+        self._sending = asyncio.ensure_future(self._send(items, self._sending))
+
+    async def _send(self, items: list[dict], previous: Optional[asyncio.Future]):
+        if previous is not None:
+            await previous
+        await self._broadcast(self._event, {"items": items})
+
 
 class PipelineOrchestrator:
     """Drone2Twin pipeline state machine (singleton)."""
@@ -49,6 +127,8 @@ class PipelineOrchestrator:
         self._initialized = True
 
         self._projects: dict[str, DroneProject] = {}
+        # Last bytes written per project id (unchanged saves are skipped)
+        self._last_saved: dict[str, bytes] = {}
         self._data_dir = config.DATA_DIR / "drone_projects"
         self._data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -56,12 +136,16 @@ class PipelineOrchestrator:
         self._mcp_client = None
         self._executor = None
         self._broadcast_fn = None
+        self._status_listeners: list[Callable] = []
 
         # Sub-engines
         self._ingest_qa = IngestQAEngine()
         self._optimizer = BlenderOptimizeEngine()
         self._perf_reporter = PerfReporter()
         self._deployer = DeploymentManager()
+        # Reconstruction adapter, created on first use and kept so its image
+        # listing and report caches carry over between runs
+        self._recon_engine = None
 
         # Load existing projects
         self._load_projects()
@@ -80,6 +164,10 @@ class PipelineOrchestrator:
         self._executor = executor
         self._broadcast_fn = broadcast_fn
 
+    def add_status_listener(self, listener: Callable):
+        """Register ``async listener(project)``, awaited whenever a project's stage changes."""
+        self._status_listeners.append(listener)
+
     # ── Project CRUD ─────────────────────────────────────────
 
     def create_project(
@@ -105,9 +193,17 @@ class PipelineOrchestrator:
             project.base_dir = str(self._data_dir / name)
 
         # Create standard folder structure
+        # (one mkdir per leaf; parents are only created when missing)
         base = Path(project.base_dir)
+        base.mkdir(parents=True, exist_ok=True)
         for subdir in PROJECT_DIRS:
-            (base / subdir).mkdir(parents=True, exist_ok=True)
+            path = os.path.join(base, subdir)
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                pass
+            except FileNotFoundError:       # e.g. raw/ for raw/images
+                os.makedirs(path, exist_ok=True)
 
         # Save project config
         self._projects[project.id] = project
@@ -116,6 +212,11 @@ class PipelineOrchestrator:
         logger.info("Created project '%s' (id=%s) at %s", name, project.id, project.base_dir)
         return project
 
+    @property
+    def project_ids(self):
+        """Live view of known project IDs (existence checks without a lookup)."""
+        return self._projects.keys()
+
     def get_project(self, project_id: str) -> Optional[DroneProject]:
         """Get project by ID."""
         return self._projects.get(project_id)
@@ -132,9 +233,11 @@ class PipelineOrchestrator:
         """Delete a project (metadata only, does not remove files)."""
         if project_id in self._projects:
             del self._projects[project_id]
-            meta_file = self._data_dir / f"{project_id}.json"
-            if meta_file.exists():
-                meta_file.unlink()
+            self._last_saved.pop(project_id, None)
+            for suffix in _STATE_FILE_SUFFIXES:
+                meta_file = self._data_dir / f"{project_id}{suffix}"
+                if meta_file.exists():
+                    meta_file.unlink()
             return True
         return False
 
@@ -145,9 +248,12 @@ class PipelineOrchestrator:
         project_id: str,
         *,
         progress_cb: Optional[Callable] = None,
+        force: bool = False,
     ) -> DroneProject:
         """Run full pipeline based on input option.
 
+        *force* re-runs stages whose inputs are unchanged (see run_stage).
+
         Option A (vendor_pack): QA → Optimize → Unity Import → WebGL Build
         Option B (raw_images):  QA → Reconstruct → Optimize → Unity Import → WebGL Build
         """
@@ -188,11 +294,13 @@ class PipelineOrchestrator:
             })
 
             try:
-                await self.run_stage(project_id, stage, progress_cb=progress_cb)
+                await self.run_stage(project_id, stage, progress_cb=progress_cb, force=force)
             except Exception as e:
                 project.stage = PipelineStage.FAILED
                 project.error = str(e)
+                project.invalidate_dict()
                 self._save_project(project)
+                await self._notify_status(project)
                 await self._broadcast("drone_pipeline_failed", {
                     "project_id": project_id,
                     "stage": stage.value,
@@ -203,7 +311,9 @@ class PipelineOrchestrator:
 
         project.stage = PipelineStage.COMPLETED
         project.updated_at = time.time()
+        project.invalidate_dict()
         self._save_project(project)
+        await self._notify_status(project)
 
         await self._broadcast("drone_pipeline_complete", {
             "project_id": project_id,
@@ -219,15 +329,38 @@ class PipelineOrchestrator:
         stage: PipelineStage,
         *,
         progress_cb: Optional[Callable] = None,
+        force: bool = False,
     ) -> DroneProject:
-        """Run a single pipeline stage."""
+        """Run a single pipeline stage.
+
+        Idempotent stages whose inputs are unchanged since their last
+        successful run (and whose outputs still exist) are skipped unless
+        *force* is set.
+        """
         project = self._projects.get(project_id)
         if not project:
             raise ValueError(f"Project '{project_id}' not found")
 
+        fingerprint = await asyncio.to_thread(self._stage_fingerprint, project, stage)
+        if (
+            not force
+            and fingerprint is not None
+            and project.stage_fingerprints.get(stage.value) == fingerprint
+            and self._stage_outputs_present(project, stage)
+        ):
+            logger.info("Stage %s unchanged for project %s — skipped", stage.value, project_id)
+            await self._broadcast("drone_stage_skipped", {
+                "project_id": project_id,
+                "stage": stage.value,
+            })
+            return project
+        project.set_stage_fingerprint(stage.value, None)
+
         project.stage = stage
         project.updated_at = time.time()
+        project.invalidate_dict()
         self._save_project(project)
+        await self._notify_status(project)
 
         handlers = {
             PipelineStage.INGEST_QA: self._run_ingest_qa,
@@ -243,7 +376,10 @@ class PipelineOrchestrator:
             raise ValueError(f"No handler for stage '{stage.value}'")
 
         await handler(project, progress_cb=progress_cb)
+        if fingerprint is not None:
+            project.set_stage_fingerprint(stage.value, fingerprint)
         self._save_project(project)
+        await self._notify_status(project)
 
         await self._broadcast("drone_stage_complete", {
             "project_id": project_id,
@@ -260,31 +396,32 @@ class PipelineOrchestrator:
             self._ingest_qa.analyze_pack, project.base_dir
         )
         project.qa_report = report
-        project.artifacts["ingest_qa"] = []
 
         # Auto-detect input option from QA
         if report.input_option:
             project.input_option = InputOption(report.input_option)
+        project.invalidate_dict()
 
         # Save report file
         report_path = Path(project.base_dir) / "reports" / "ingest_qa.json"
         report_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
-        project.artifacts["ingest_qa"].append(str(report_path))
+        json_io.write_json(report_path, report.to_dict())
+        project.set_artifact("ingest_qa", [str(report_path)])
 
         logger.info("IngestQA complete: score=%d, option=%s", report.score, report.input_option)
 
     async def _run_reconstruction(self, project: DroneProject, **kwargs):
         """Run 3D reconstruction (Option B only)."""
-        from .recon_engines.colmap_adapter import ColmapAdapter
-
         engine_name = config.RECON_ENGINE.lower()
-        if engine_name == "colmap":
-            engine = ColmapAdapter()
-        else:
+        if engine_name != "colmap":
             raise ValueError(f"Unsupported reconstruction engine: {engine_name}")
+        if self._recon_engine is None:
+            from .recon_engines.colmap_adapter import ColmapAdapter
+            self._recon_engine = ColmapAdapter()
+        engine = self._recon_engine
 
+        if not engine.is_available:
+            engine.refresh()  # COLMAP may have been installed since the last run
         if not engine.is_available:
             logger.warning(
                 "Reconstruction engine '%s' not available — skipping with warning",
@@ -295,6 +432,7 @@ class PipelineOrchestrator:
                 preset=project.preset.value,
                 warnings=[f"{engine.name} not installed — reconstruction skipped"],
             )
+            project.invalidate_dict()
             return
 
         progress_cb = kwargs.get("progress_cb")
@@ -307,12 +445,11 @@ class PipelineOrchestrator:
 
         # Collect artifacts
         artifacts = engine.get_artifacts(project.base_dir)
-        project.artifacts["reconstruction"] = list(artifacts.values())
+        project.set_artifact("reconstruction", list(artifacts.values()))
 
         # Save report
         report_path = Path(project.base_dir) / "reports" / "recon_report.json"
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+        json_io.write_json(report_path, report.to_dict())
 
     async def _run_optimization(self, project: DroneProject, **kwargs):
         """Run mesh optimization (Blender CLI or stub)."""
@@ -324,6 +461,7 @@ class PipelineOrchestrator:
             project.optimize_report = OptimizeReport(
                 warnings=["No mesh file found for optimization"],
             )
+            project.invalidate_dict()
             return
 
         output_dir = str(base / "work" / "optimize")
@@ -333,12 +471,11 @@ class PipelineOrchestrator:
             input_mesh, output_dir, project.preset, progress_cb=progress_cb,
         )
         project.optimize_report = report
-        project.artifacts["optimization"] = report.output_files
+        project.set_artifact("optimization", report.output_files)
 
         # Save report
         report_path = base / "reports" / "optimize_report.json"
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+        json_io.write_json(report_path, report.to_dict())
 
     async def _run_unity_import(self, project: DroneProject, **kwargs):
         """Generate and execute Unity import plan via MCP."""
@@ -352,12 +489,7 @@ class PipelineOrchestrator:
         # Find optimized GLB files (or original mesh)
         base = Path(project.base_dir)
         optimize_dir = base / "work" / "optimize"
-        glb_paths = []
-
-        if optimize_dir.is_dir():
-            for f in optimize_dir.iterdir():
-                if f.suffix.lower() in {".glb", ".gltf", ".fbx", ".obj"}:
-                    glb_paths.append(str(f))
+        glb_paths = list(_iter_mesh_files(str(optimize_dir), _OPTIMIZED_MESH_EXTS))
 
         if not glb_paths:
             # Fallback: try vendor/ or raw mesh
@@ -371,7 +503,7 @@ class PipelineOrchestrator:
 
         # Generate plan
         plan = generate_import_plan(glb_paths)
-        project.artifacts["unity_import"] = [str(base / "work" / "unity")]
+        project.set_artifact("unity_import", [str(base / "work" / "unity")])
 
         # Execute via MCP executor (if available)
         if self._executor and self._mcp_client:
@@ -385,17 +517,17 @@ class PipelineOrchestrator:
                     plan=plan,
                     method="drone_pipeline",
                 )
-                project.artifacts["unity_import_result"] = {
+                project.set_artifact("unity_import_result", {
                     "job_id": job_id,
                     "status": result.status.value if hasattr(result.status, "value") else str(result.status),
-                }
+                })
                 logger.info("Unity import executed: job_id=%s", job_id)
             except Exception as e:
                 logger.error("Unity import failed: %s", e)
                 raise
         else:
             # Store plan for manual approval
-            project.artifacts["unity_import_plan"] = plan
+            project.set_artifact("unity_import_plan", plan)
             logger.info("Unity import plan generated (no MCP — stored for manual approval)")
 
     async def _run_unity_import_obj_tiles(self, project: DroneProject, **kwargs):
@@ -419,13 +551,14 @@ class PipelineOrchestrator:
         total = len(tiles)
         results = []
         failed = []
+        tile_progress = _BatchedBroadcaster(self._broadcast, "drone_tile_progress_batch")
 
         for i, tile in enumerate(tiles):
             tile_name = tile.get("name", f"tile_{i}")
             size_mb = tile.get("size_mb", 0)
 
-            # Broadcast per-tile progress
-            await self._broadcast("drone_tile_progress", {
+            # Per-tile progress (coalesced into batched frames)
+            tile_progress.push({
                 "project_id": project.id,
                 "tile_index": i,
                 "total": total,
@@ -478,11 +611,12 @@ class PipelineOrchestrator:
                 })
 
         # Save results
-        project.artifacts["unity_import"] = results
+        project.set_artifact("unity_import", results)
         if failed:
-            project.artifacts["unity_import_failed"] = failed
+            project.set_artifact("unity_import_failed", failed)
 
-        # Broadcast completion
+        # Broadcast completion (after any pending progress)
+        await tile_progress.flush()
         await self._broadcast("drone_tiles_complete", {
             "project_id": project.id,
             "total": total,
@@ -536,12 +670,15 @@ class PipelineOrchestrator:
                     plan=plan,
                     method="drone_pipeline",
                 )
-                project.artifacts["webgl_build"] = [output_path]
+                project.set_artifact("webgl_build", [output_path])
 
-                # Generate performance report
-                perf = self._perf_reporter.analyze_build(output_path)
+                # Generate performance report. The build walk and report
+                # write run off the event loop.
+                perf = await asyncio.to_thread(self._perf_reporter.analyze_build, output_path)
                 project.perf_report = perf
-                self._perf_reporter.generate_report_file(
+                project.invalidate_dict()
+                await asyncio.to_thread(
+                    self._perf_reporter.generate_report_file,
                     output_path,
                     perf,
                     str(base / "reports"),
@@ -550,7 +687,7 @@ class PipelineOrchestrator:
                 logger.error("WebGL build failed: %s", e)
                 raise
         else:
-            project.artifacts["webgl_build_plan"] = plan
+            project.set_artifact("webgl_build_plan", plan)
             logger.info("WebGL build plan generated (no MCP — stored for manual approval)")
 
     async def _run_deploy(self, project: DroneProject, **kwargs):
@@ -563,7 +700,7 @@ class PipelineOrchestrator:
             return
 
         result = self._deployer.deploy(build_dir)
-        project.artifacts["deploy"] = result
+        project.set_artifact("deploy", result)
 
         # Smoke test if URL is derivable
         # (would need server URL configuration — skip for now)
@@ -582,17 +719,47 @@ class PipelineOrchestrator:
             base / "vendor",
             base,
         ]
-        mesh_exts = {".glb", ".gltf", ".fbx", ".obj", ".ply"}
-
         for search_dir in search_dirs:
-            if not search_dir.is_dir():
-                continue
-            for f in search_dir.iterdir():
-                if f.suffix.lower() in mesh_exts:
-                    return str(f)
+            mesh = next(_iter_mesh_files(str(search_dir), MESH_EXTS), None)
+            if mesh is not None:
+                return mesh
 
         return None
 
+    def _stage_fingerprint(self, project: DroneProject, stage: PipelineStage) -> Optional[str]:
+        """Digest of the inputs of an idempotent stage, or None if it always runs.
+
+        INGEST_QA is not fingerprinted here: analyze_pack already reuses its
+        report while the pack's tree fingerprint is unchanged.  WEBGL_BUILD's
+        input is the Unity scene state, which is not visible from the project
+        folder.
+        """
+        if stage == PipelineStage.OPTIMIZATION:
+            mesh = self._find_input_mesh(project)
+            if mesh is None:
+                return None
+            try:
+                st = os.stat(mesh)
+            except OSError:
+                return None
+            parts = (stage.value, project.preset.value, mesh, st.st_size, st.st_mtime_ns)
+        else:
+            return None
+        # sha1 rather than hash(): str hashes are randomized per process
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _stage_outputs_present(project: DroneProject, stage: PipelineStage) -> bool:
+        """True if the results of *stage*'s last run are still available."""
+        if stage == PipelineStage.OPTIMIZATION:
+            report = project.optimize_report
+            return (
+                report is not None
+                and bool(report.output_files)
+                and all(os.path.exists(p) for p in report.output_files)
+            )
+        return False
+
     async def _broadcast(self, event: str, data: dict):
         """Broadcast event via WebSocket (if available)."""
         if self._broadcast_fn:
@@ -601,26 +768,87 @@ class PipelineOrchestrator:
             except Exception as e:
                 logger.debug("Broadcast failed: %s", e)
 
+    async def _notify_status(self, project: DroneProject):
+        """Pass *project* to the status listeners (see add_status_listener)."""
+        for listener in self._status_listeners:
+            try:
+                await listener(project)
+            except Exception as e:
+                logger.debug("Status listener failed: %s", e)
+
     # ── Persistence ──────────────────────────────────────────
 
     def _save_project(self, project: DroneProject):
-        """Save project metadata to JSON file."""
-        path = self._data_dir / f"{project.id}.json"
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(project.to_dict(), f, indent=2, ensure_ascii=False)
+        """Save project metadata (msgpack when installed, else JSON).
+
+        Skipped when the serialized state matches the last write; otherwise
+        written to a temp file and renamed so readers never see partial data.
+        """
+        data = state_io.serialize_state(project.to_dict())
+        if self._last_saved.get(project.id) == data:
+            return
+        path = self._data_dir / f"{project.id}{state_io.STATE_SUFFIX}"
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._last_saved[project.id] = data
 
     def _load_projects(self):
-        """Load all projects from data directory."""
-        if not self._data_dir.is_dir():
+        """Load all projects from data directory.
+
+        msgpack files take precedence; JSON files from older versions get a
+        msgpack copy when msgpack is installed and are kept, so the project
+        still loads where it is not.  msgpack files that cannot be decoded
+        because msgpack is missing raise instead of dropping their projects.
+        """
+        names: dict[str, str] = {}
+        try:
+            with os.scandir(self._data_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(_STATE_FILE_SUFFIXES) and entry.is_file():
+                        names[entry.name] = entry.path
+        except OSError:
             return
-        for f in self._data_dir.glob("*.json"):
+        if not state_io.HAS_MSGPACK:
+            packed = sorted(n for n in names if n.endswith(".msgpack"))
+            if packed:
+                raise RuntimeError(
+                    f"{len(packed)} project state file(s) in {self._data_dir} are msgpack "
+                    f"but msgpack is not installed (pip install msgpack): {', '.join(packed[:5])}"
+                )
+        # JSON files with a msgpack copy are not read
+        paths = [
+            path for name, path in names.items()
+            if not (name.endswith(".json") and name[:-5] + ".msgpack" in names)
+        ]
+        paths.sort(key=lambda p: not p.endswith(".msgpack"))
+
+        # File reads overlap in a small pool; decoding stays on this thread
+        with ThreadPoolExecutor(max_workers=_LOAD_WORKERS) as pool:
+            raws = list(pool.map(_read_bytes, paths))
+
+        for path, raw in zip(paths, raws):
+            name = os.path.basename(path)
+            stem, suffix = os.path.splitext(name)
             try:
-                with open(f, "r", encoding="utf-8") as fh:
-                    data = json.load(fh)
-                project = DroneProject.from_dict(data)
-                self._projects[project.id] = project
+                if isinstance(raw, OSError):
+                    raise raw
+                project = DroneProject.from_dict(state_io.load_state(raw, suffix))
             except Exception as e:
-                logger.warning("Failed to load project %s: %s", f.name, e)
+                logger.error("Failed to load project %s: %s", name, e)
+                continue
+            if project.id in self._projects:
+                continue
+            self._projects[project.id] = project
+            if suffix == state_io.STATE_SUFFIX:
+                if stem == project.id:
+                    self._last_saved[project.id] = raw
+            else:
+                try:
+                    self._save_project(project)
+                except OSError as e:
+                    logger.debug("Could not migrate project %s: %s", name, e)
 
     def get_reports(self, project_id: str) -> dict:
         """Get all reports for a project."""
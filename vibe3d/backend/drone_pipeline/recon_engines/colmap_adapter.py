@@ -15,15 +15,27 @@ surface actionable messages to the user.
 """
 
 import asyncio
-import json
+import copy
+import hashlib
 import logging
 import os
+import re
 import shutil
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, Optional
 
-from ...config import COLMAP_PATH
+try:
+    import blake3
+except ImportError:  # optional dependency
+    blake3 = None
+
+from ...config import COLMAP_GPU_INDICES, COLMAP_PATH
+from .. import json_io
+from .._procgroup import DRAIN_GRACE_SECONDS, SPAWN_KWARGS, terminate_process_group, wait_exit
 from ..models import QAReport, ReconReport, Preset
 from .base import ReconEngineBase
 
@@ -31,7 +43,9 @@ logger = logging.getLogger(__name__)
 
 # -- Constants ----------------------------------------------------------------
 
-_SUPPORTED_IMAGE_EXTS: set[str] = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+# Tuples for str.endswith on the lower-cased file name (no Path/splitext per entry)
+_SUPPORTED_IMAGE_EXTS: tuple[str, ...] = (".jpg", ".jpeg", ".png", ".tif", ".tiff")
+_TEXTURE_EXTS: tuple[str, ...] = (".jpg", ".jpeg", ".png")
 
 _MIN_IMAGES = 3
 _RECOMMENDED_IMAGES = 20
@@ -40,6 +54,190 @@ _RECOMMENDED_IMAGES = 20
 _PREVIEW_MAX_IMAGE_SIZE = 1000   # pixels (longest edge)
 _PRODUCTION_MAX_IMAGE_SIZE = -1  # unlimited
 
+# Subprocess output kept for error reporting (COLMAP stereo logs run to
+# hundreds of MB, so only the tail is held in memory)
+_LOG_TAIL_LINES = 500
+
+_HAS_DIR_FD_STAT = os.stat in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+# Manifest stat sweeps over this many images are split across threads so
+# the stat() calls overlap (they release the GIL)
+_PARALLEL_STAT_MIN = 2000
+_STAT_WORKERS = 8
+
+# Progress counters across COLMAP stages, one alternation so each line is
+# scanned once, on raw bytes (no decode):
+#   "Processed file [N/M]", "Matching block [N/M, ...]", "Fusing image [N/M]",
+#   "Undistorting image [N/M]", "Processing view N / M" (patch_match_stereo)
+_PROGRESS_RE = re.compile(rb"\[(\d+)/(\d+)[\],]|Processing view (\d+) / (\d+)")
+
+
+def _scan_images(images_dir: str) -> list[str]:
+    """Return names of supported images directly inside *images_dir*.
+
+    DirEntry.is_file() uses the type from the directory read (no stat).
+    """
+    with os.scandir(images_dir) as it:
+        return [
+            e.name for e in it
+            if e.name.lower().endswith(_SUPPORTED_IMAGE_EXTS) and e.is_file()
+        ]
+
+
+def _scan_image_stats(images_dir: str) -> list[tuple[str, int, int]]:
+    """Return ``(name, size, mtime_ns)`` of supported images in *images_dir*.
+
+    Uses DirEntry.stat(), which is cached on the entry (and free on
+    Windows, where the directory read already carries it).
+    """
+    stats: list[tuple[str, int, int]] = []
+    with os.scandir(images_dir) as it:
+        for e in it:
+            if e.name.lower().endswith(_SUPPORTED_IMAGE_EXTS) and e.is_file():
+                st = e.stat()
+                stats.append((e.name, st.st_size, st.st_mtime_ns))
+    return stats
+
+
+def _stat_names(
+    images_dir: str, names: list[str], dir_fd: Optional[int],
+) -> list[tuple[str, int, int]]:
+    """``(name, size, mtime_ns)`` for *names*, relative to *dir_fd* if given."""
+    if dir_fd is None:
+        join = os.path.join
+        return [
+            (name, st.st_size, st.st_mtime_ns)
+            for name in names
+            for st in (os.stat(join(images_dir, name)),)
+        ]
+    return [
+        (name, st.st_size, st.st_mtime_ns)
+        for name in names
+        for st in (os.stat(name, dir_fd=dir_fd),)
+    ]
+
+
+def _stat_images(images_dir: str, names: list[str]) -> list[tuple[str, int, int]]:
+    """``(name, size, mtime_ns)`` for already-listed *names*.
+
+    Names are resolved relative to a directory fd where supported, so each
+    image costs one stat without re-walking the path.  Large listings are
+    statted in ``_STAT_WORKERS`` chunks concurrently.
+    """
+    fd = os.open(images_dir, os.O_RDONLY | os.O_DIRECTORY) if _HAS_DIR_FD_STAT else None
+    try:
+        if len(names) < _PARALLEL_STAT_MIN:
+            return _stat_names(images_dir, names, fd)
+        step = -(-len(names) // _STAT_WORKERS)
+        chunks = [names[i:i + step] for i in range(0, len(names), step)]
+        with ThreadPoolExecutor(max_workers=_STAT_WORKERS) as pool:
+            parts = pool.map(lambda chunk: _stat_names(images_dir, chunk, fd), chunks)
+            return [row for part in parts for row in part]
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _count_images(images_dir: str, limit: Optional[int] = None) -> int:
+    """Count supported images in *images_dir* without building a list.
+
+    Stops early once *limit* (if given) is reached.
+    """
+    count = 0
+    exts = _SUPPORTED_IMAGE_EXTS
+    with os.scandir(images_dir) as it:
+        for e in it:
+            if e.name.lower().endswith(exts) and e.is_file():
+                count += 1
+                if count == limit:
+                    break
+    return count
+
+
+@dataclass(slots=True, frozen=True)
+class _Paths:
+    """Path strings for one COLMAP run, built once and shared by every stage argv."""
+    images: str
+    work: str
+    database: str
+    sparse: str
+    sparse_model: str
+    dense: str
+    fused_ply: str
+    mesh_ply: str
+    report: str
+
+    @classmethod
+    def for_project(cls, project_dir: str) -> "_Paths":
+        join = os.path.join
+        work = join(project_dir, "work", "recon")
+        sparse = join(work, "sparse")
+        return cls(
+            images=join(project_dir, "raw", "images"),
+            work=work,
+            database=join(work, "db.db"),
+            sparse=sparse,
+            sparse_model=join(sparse, "0"),
+            dense=join(work, "dense"),
+            fused_ply=join(work, "fused.ply"),
+            mesh_ply=join(work, "meshed-poisson.ply"),
+            report=join(work, "recon_report.json"),
+        )
+
+
+async def _drain_lines(
+    stream: asyncio.StreamReader,
+    tail: deque,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> None:
+    """Read *stream* to EOF into *tail*, reporting ``_PROGRESS_RE`` counters."""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:  # over-long line, already discarded by the reader
+            continue
+        if not line:
+            break
+        tail.append(line)
+        if on_progress is not None:
+            m = _PROGRESS_RE.search(line)
+            if m is not None:
+                done, total = m.group(1, 2) if m.lastindex == 2 else m.group(3, 4)
+                if int(total):
+                    on_progress(int(done) / int(total))
+
+
+def _image_manifest(stats: list[tuple[str, int, int]]) -> str:
+    """Digest of the sorted ``(name, size, mtime_ns)`` of each input image.
+
+    blake3 (SIMD) when installed, else blake2b.  The two digests differ, so
+    switching implementations just forces one re-run.
+    """
+    data = "".join(
+        f"{name}|{size}|{mtime_ns}\n" for name, size, mtime_ns in sorted(stats)
+    ).encode()
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest(length=16)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _write_image_lists(list_paths: list[str], shards: list[list[str]]) -> None:
+    """Write one ``--image_list_path`` file (image names, one per line) per shard."""
+    for path, names in zip(list_paths, shards):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(names))
+
+
+def _remove_files(paths: list[str]) -> None:
+    """Delete *paths*, ignoring ones that are already gone."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.debug("Could not remove %s: %s", path, exc)
+
 
 class ColmapAdapter(ReconEngineBase):
     """COLMAP CLI reconstruction adapter.
@@ -54,6 +252,40 @@ class ColmapAdapter(ReconEngineBase):
 
     def __init__(self) -> None:
         self._colmap_path: str = COLMAP_PATH
+        self._is_abs: bool = os.path.isabs(self._colmap_path)
+        self._resolved: Optional[str] = self._resolve()
+        self._gpu_indices: list[str] = [
+            g.strip() for g in COLMAP_GPU_INDICES.split(",") if g.strip()
+        ]
+        # (images_dir, dir mtime_ns, image names) from the last scan
+        self._image_scan: Optional[tuple[str, int, list[str]]] = None
+        # report path -> ((mtime_ns, size), parsed report)
+        self._report_cache: dict[str, tuple[tuple[int, int], ReconReport]] = {}
+
+    def _resolve(self) -> Optional[str]:
+        """Locate the COLMAP binary.
+
+        An absolute ``COLMAP_PATH`` (the usual ``.env`` setting) is checked
+        directly with ``os.path.isfile`` and ``os.access`` instead of a
+        ``shutil.which`` lookup.  ``shutil.which`` remains the fallback for
+        bare names and for Windows paths given without their extension.
+        """
+        path = self._colmap_path
+        if self._is_abs and os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+        return shutil.which(path)
+
+    def _argv(self, subcommand: str, *args: str) -> list[str]:
+        """Stage argv starting with the resolved binary.
+
+        Spawning by absolute path skips the per-exec PATH search; the
+        configured name is used only if resolution failed.
+        """
+        return [self._resolved or self._colmap_path, subcommand, *args]
+
+    def refresh(self) -> None:
+        """Re-resolve the COLMAP binary (e.g. after installing it)."""
+        self._resolved = self._resolve()
 
     # -- Properties ------------------------------------------------------------
 
@@ -63,18 +295,102 @@ class ColmapAdapter(ReconEngineBase):
 
     @property
     def is_available(self) -> bool:
-        """Check if the COLMAP binary is accessible on ``PATH``."""
-        return bool(shutil.which(self._colmap_path))
+        """Check if the COLMAP binary is accessible on ``PATH``.
+
+        Resolved once in ``__init__``; call :meth:`refresh` to re-check.
+        """
+        return self._resolved is not None
+
+    # -- Report file -----------------------------------------------------------
+
+    def _load_report(self, path: str) -> Optional[ReconReport]:
+        """Return the ReconReport saved at *path*, or None if missing/unreadable.
+
+        Parsed reports are cached until the file's mtime or size changes.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._report_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return copy.deepcopy(cached[1])
+        try:
+            report = ReconReport(**json_io.read_json(path))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("Ignoring unreadable recon report %s: %s", path, e)
+            return None
+        self._report_cache[path] = (key, copy.deepcopy(report))
+        return report
+
+    def _save_report(self, path: str, report: ReconReport) -> None:
+        """Write *report* to *path* and prime the read cache with it."""
+        json_io.write_json(path, report.to_dict())
+        st = os.stat(path)
+        self._report_cache[path] = ((st.st_mtime_ns, st.st_size), copy.deepcopy(report))
 
     # -- Input validation ------------------------------------------------------
 
-    async def validate_inputs(self, project_dir: str) -> QAReport:
+    def _cached_listing(self, images_dir: str) -> tuple[int, Optional[list[str]]]:
+        """Return (dir mtime_ns, cached image names or None if stale/absent).
+
+        Adding or removing an entry bumps the directory mtime, which
+        invalidates the listing.
+        """
+        mtime = os.stat(images_dir).st_mtime_ns
+        cached = self._image_scan
+        if cached is not None and cached[0] == images_dir and cached[1] == mtime:
+            return mtime, cached[2]
+        return mtime, None
+
+    def _count_listed_images(self, images_dir: str) -> int:
+        """Exact image count: the cached listing's length, else a streaming count."""
+        images_dir = os.path.normpath(images_dir)
+        _, names = self._cached_listing(images_dir)
+        return len(names) if names is not None else _count_images(images_dir)
+
+    def _list_images(self, images_dir: str) -> list[str]:
+        """``_scan_images`` reused while the directory mtime is unchanged."""
+        images_dir = os.path.normpath(images_dir)
+        mtime, names = self._cached_listing(images_dir)
+        if names is not None:
+            return names
+        names = _scan_images(images_dir)
+        self._image_scan = (images_dir, mtime, names)
+        return names
+
+    def _image_stats(self, images_dir: str) -> list[tuple[str, int, int]]:
+        """Fresh ``(name, size, mtime_ns)`` per image for the input manifest.
+
+        Stats are always re-read (editing a file does not bump the directory
+        mtime); only the listing is reused from :meth:`_list_images`.  On
+        Windows the directory read already carries the stats, elsewhere the
+        names are listed first and statted by :func:`_stat_images`.
+        """
+        images_dir = os.path.normpath(images_dir)
+        mtime, names = self._cached_listing(images_dir)
+        if names is None:
+            if os.name == "nt":
+                stats = _scan_image_stats(images_dir)
+                self._image_scan = (images_dir, mtime, [name for name, _, _ in stats])
+                return stats
+            names = _scan_images(images_dir)
+            self._image_scan = (images_dir, mtime, names)
+        return _stat_images(images_dir, names)
+
+    async def validate_inputs(self, project_dir: str, *, exact_count: bool = True) -> QAReport:
         """Validate images exist and COLMAP is accessible.
 
         Checks performed:
             - ``raw/images/`` directory exists.
             - At least ``_MIN_IMAGES`` supported images present.
             - COLMAP binary is reachable.
+
+        With ``exact_count=False`` the scan stops at ``_RECOMMENDED_IMAGES``
+        (enough to score the input), so ``image_count`` is a lower bound.
         """
         report = QAReport(score=50)
         proj = Path(project_dir)
@@ -89,12 +405,14 @@ class ColmapAdapter(ReconEngineBase):
             logger.warning("validate_inputs: images dir missing -- %s", images_dir)
             return report
 
-        # Count supported images
-        image_files = [
-            f for f in images_dir.iterdir()
-            if f.is_file() and f.suffix.lower() in _SUPPORTED_IMAGE_EXTS
-        ]
-        image_count = len(image_files)
+        # Count supported images (aggregates only -- no per-image list).
+        # Blocking directory scan (slow on SMB/NFS mounts) runs off the loop
+        if exact_count:
+            image_count = await asyncio.to_thread(self._count_listed_images, str(images_dir))
+        else:
+            image_count = await asyncio.to_thread(
+                _count_images, str(images_dir), _RECOMMENDED_IMAGES,
+            )
         report.image_count = image_count
 
         if image_count < _MIN_IMAGES:
@@ -167,37 +485,42 @@ class ColmapAdapter(ReconEngineBase):
         Scans ``work/recon/`` for known output files and returns only
         those that exist on disk.
         """
-        work = Path(project_dir) / "work" / "recon"
+        work = os.path.join(project_dir, "work", "recon")
+        isfile = os.path.isfile
         artifacts: dict[str, Any] = {}
 
         # Dense point cloud
         for candidate in ("dense.ply", "fused.ply"):
-            path = work / candidate
-            if path.exists():
-                artifacts["dense_cloud"] = str(path)
+            path = os.path.join(work, candidate)
+            if isfile(path):
+                artifacts["dense_cloud"] = path
                 break
 
         # High-poly mesh
         for candidate in ("meshed-poisson.ply", "mesh.obj", "mesh.ply"):
-            path = work / candidate
-            if path.exists():
-                artifacts["mesh_high"] = str(path)
+            path = os.path.join(work, candidate)
+            if isfile(path):
+                artifacts["mesh_high"] = path
                 break
 
-        # Textures
-        tex_dir = work / "textures"
-        if tex_dir.is_dir():
-            tex_files = [
-                str(f) for f in sorted(tex_dir.iterdir())
-                if f.is_file() and f.suffix.lower() in {".jpg", ".jpeg", ".png"}
-            ]
-            if tex_files:
-                artifacts["textures"] = tex_files
+        # Textures (a missing folder just means no textures); filter on the
+        # name first, then sort only the kept paths
+        try:
+            with os.scandir(os.path.join(work, "textures")) as it:
+                tex_files = [
+                    e.path for e in it
+                    if e.name.lower().endswith(_TEXTURE_EXTS) and e.is_file()
+                ]
+        except OSError:
+            tex_files = []
+        if tex_files:
+            tex_files.sort()
+            artifacts["textures"] = tex_files
 
         # Reconstruction report
-        report_path = work / "recon_report.json"
-        if report_path.exists():
-            artifacts["recon_report"] = str(report_path)
+        report_path = os.path.join(work, "recon_report.json")
+        if isfile(report_path):
+            artifacts["recon_report"] = report_path
 
         logger.debug("get_artifacts: %s -> %s", project_dir, list(artifacts.keys()))
         return artifacts
@@ -244,17 +567,12 @@ class ColmapAdapter(ReconEngineBase):
             logger.warning("_run_colmap: COLMAP binary not available, aborting")
             return report
 
-        proj = Path(project_dir)
-        images_dir = proj / "raw" / "images"
-        work_dir = proj / "work" / "recon"
-        work_dir.mkdir(parents=True, exist_ok=True)
+        paths = _Paths.for_project(project_dir)
+        os.makedirs(paths.work, exist_ok=True)
 
         # Count input images
-        images = [
-            f for f in images_dir.iterdir()
-            if f.is_file() and f.suffix.lower() in _SUPPORTED_IMAGE_EXTS
-        ]
-        report.image_count = len(images)
+        image_stats = await asyncio.to_thread(self._image_stats, paths.images)
+        report.image_count = len(image_stats)
 
         if report.image_count < _MIN_IMAGES:
             report.warnings.append(
@@ -264,6 +582,21 @@ class ColmapAdapter(ReconEngineBase):
             report.elapsed_seconds = time.time() - start_time
             return report
 
+        # Skip the run if the images and preset match the last saved report
+        # (the report is only written once every stage has finished)
+        report.input_manifest = _image_manifest(image_stats)
+        previous = await asyncio.to_thread(self._load_report, paths.report)
+        if (
+            previous is not None
+            and previous.input_manifest == report.input_manifest
+            and previous.preset == report.preset
+        ):
+            logger.info(
+                "_run_colmap: inputs unchanged since last run -- reusing %s",
+                paths.report,
+            )
+            return previous
+
         # Determine matching strategy based on image count
         use_sequential = report.image_count > 100
         max_image_size = (
@@ -286,58 +619,51 @@ class ColmapAdapter(ReconEngineBase):
         # COLMAP command.  The full implementation is gated on COLMAP
         # binary integration.
         #
-        # Stage 1: Feature extraction
-        #   await self._run_subprocess([
-        #       self._colmap_path, "feature_extractor",
-        #       "--database_path", str(work_dir / "db.db"),
-        #       "--image_path", str(images_dir),
-        #       "--ImageReader.single_camera", "1",
-        #   ])
+        # Stage 1: Feature extraction (one process per configured GPU)
+        #   await self._extract_features(paths, self._list_images(paths.images))
         #
         # Stage 2: Feature matching
         #   matcher = "sequential_matcher" if use_sequential else "exhaustive_matcher"
-        #   await self._run_subprocess([
-        #       self._colmap_path, matcher,
-        #       "--database_path", str(work_dir / "db.db"),
-        #   ])
+        #   await self._run_subprocess(self._argv(
+        #       matcher,
+        #       "--database_path", paths.database,
+        #   ))
         #
         # Stage 3: Sparse reconstruction
-        #   sparse_dir = work_dir / "sparse"
-        #   sparse_dir.mkdir(exist_ok=True)
-        #   await self._run_subprocess([
-        #       self._colmap_path, "mapper",
-        #       "--database_path", str(work_dir / "db.db"),
-        #       "--image_path", str(images_dir),
-        #       "--output_path", str(sparse_dir),
-        #   ])
+        #   os.makedirs(paths.sparse, exist_ok=True)
+        #   await self._run_subprocess(self._argv(
+        #       "mapper",
+        #       "--database_path", paths.database,
+        #       "--image_path", paths.images,
+        #       "--output_path", paths.sparse,
+        #   ))
         #
         # Stage 4: Dense reconstruction
-        #   dense_dir = work_dir / "dense"
-        #   await self._run_subprocess([
-        #       self._colmap_path, "image_undistorter",
-        #       "--image_path", str(images_dir),
-        #       "--input_path", str(sparse_dir / "0"),
-        #       "--output_path", str(dense_dir),
+        #   await self._run_subprocess(self._argv(
+        #       "image_undistorter",
+        #       "--image_path", paths.images,
+        #       "--input_path", paths.sparse_model,
+        #       "--output_path", paths.dense,
         #       "--output_type", "COLMAP",
-        #   ])
-        #   await self._run_subprocess([
-        #       self._colmap_path, "patch_match_stereo",
-        #       "--workspace_path", str(dense_dir),
+        #   ))
+        #   await self._run_subprocess(self._argv(
+        #       "patch_match_stereo",
+        #       "--workspace_path", paths.dense,
         #       *(["--PatchMatchStereo.max_image_size",
         #          str(max_image_size)] if max_image_size > 0 else []),
-        #   ])
-        #   await self._run_subprocess([
-        #       self._colmap_path, "stereo_fusion",
-        #       "--workspace_path", str(dense_dir),
-        #       "--output_path", str(work_dir / "fused.ply"),
-        #   ])
+        #   ))
+        #   await self._run_subprocess(self._argv(
+        #       "stereo_fusion",
+        #       "--workspace_path", paths.dense,
+        #       "--output_path", paths.fused_ply,
+        #   ))
         #
         # Stage 5: Meshing
-        #   await self._run_subprocess([
-        #       self._colmap_path, "poisson_mesher",
-        #       "--input_path", str(work_dir / "fused.ply"),
-        #       "--output_path", str(work_dir / "meshed-poisson.ply"),
-        #   ])
+        #   await self._run_subprocess(self._argv(
+        #       "poisson_mesher",
+        #       "--input_path", paths.fused_ply,
+        #       "--output_path", paths.mesh_ply,
+        #   ))
 
         report.warnings.append(
             "COLMAP pipeline execution not yet implemented. "
@@ -347,17 +673,90 @@ class ColmapAdapter(ReconEngineBase):
         report.elapsed_seconds = time.time() - start_time
 
         # -- Persist report to disk --------------------------------------------
-        report_path = work_dir / "recon_report.json"
         try:
-            with open(report_path, "w", encoding="utf-8") as f:
-                json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
-            logger.info("Reconstruction report saved to %s", report_path)
+            await asyncio.to_thread(self._save_report, paths.report, report)
+            logger.info("Reconstruction report saved to %s", paths.report)
         except OSError as exc:
             logger.error("Failed to write recon report: %s", exc)
             report.warnings.append(f"Could not save report: {exc}")
 
         return report
 
+    # -- Stage helpers (for future use) ----------------------------------------
+
+    async def _extract_features(self, paths: _Paths, images: list[str]) -> None:
+        """Run ``feature_extractor``, sharded across ``COLMAP_GPU_INDICES``.
+
+        Extraction is independent per image, so with several GPUs the images
+        are split round-robin and one process runs per GPU concurrently.
+        Each shard writes its own database (SQLite has a single writer) and
+        the shards are folded into ``paths.database`` with
+        ``database_merger``.  Shards register separate cameras, so
+        ``single_camera`` holds per GPU rather than globally.  The shard and
+        intermediate merge databases are removed once merged.
+        """
+        base_cmd = self._argv(
+            "feature_extractor",
+            "--image_path", paths.images,
+            "--ImageReader.single_camera", "1",
+        )
+        gpus = self._gpu_indices
+        if len(gpus) <= 1 or len(images) < len(gpus):
+            gpu_args = ["--SiftExtraction.gpu_index", gpus[0]] if gpus else []
+            await self._run_subprocess(
+                [*base_cmd, "--database_path", paths.database, *gpu_args]
+            )
+            return
+
+        n = len(gpus)
+        shard_dbs = [os.path.join(paths.work, f"db_gpu{gpu}.db") for gpu in gpus]
+        list_paths = [os.path.join(paths.work, f"images_gpu{gpu}.txt") for gpu in gpus]
+        await asyncio.to_thread(
+            _write_image_lists, list_paths, [images[i::n] for i in range(n)],
+        )
+        merge_dbs = [os.path.join(paths.work, f"db_merge{i}.db") for i in range(2, n)]
+        try:
+            await self._run_shards([
+                [
+                    *base_cmd,
+                    "--database_path", db,
+                    "--image_list_path", list_path,
+                    "--SiftExtraction.gpu_index", gpu,
+                ]
+                for gpu, db, list_path in zip(gpus, shard_dbs, list_paths)
+            ])
+
+            merged = shard_dbs[0]
+            for i, db in enumerate(shard_dbs[1:], start=2):
+                out = paths.database if i == n else merge_dbs[i - 2]
+                await self._run_subprocess(self._argv(
+                    "database_merger",
+                    "--database_path1", merged,
+                    "--database_path2", db,
+                    "--merged_database_path", out,
+                ))
+                merged = out
+        finally:
+            # Stale shard databases would make a rerun skip those images
+            await asyncio.to_thread(_remove_files, shard_dbs + merge_dbs + list_paths)
+
+    async def _run_shards(self, cmds: list[list[str]]) -> None:
+        """Run *cmds* concurrently; the first failure cancels the rest.
+
+        Cancelled shards have their process groups terminated by
+        ``_run_subprocess`` before the failure is re-raised.
+        """
+        tasks = [asyncio.ensure_future(self._run_subprocess(cmd)) for cmd in cmds]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
     # -- Subprocess helper (for future use) ------------------------------------
 
     async def _run_subprocess(
@@ -366,16 +765,25 @@ class ColmapAdapter(ReconEngineBase):
         *,
         cwd: Optional[str] = None,
         timeout: float = 3600.0,
+        progress_cb: Optional[Callable[[str, float], None]] = None,
     ) -> tuple[int, str, str]:
         """Run a COLMAP subprocess asynchronously.
 
+        Output is streamed line by line: only the last ``_LOG_TAIL_LINES``
+        lines of each stream are kept, and progress counters are forwarded
+        to *progress_cb* as ``(subcommand, N / M)``.
+
         Args:
             cmd: Command and arguments to execute.
             cwd: Working directory for the subprocess.
             timeout: Maximum execution time in seconds (default: 1 hour).
+            progress_cb: Optional ``(stage, percent)`` callback.
 
         Returns:
-            Tuple of (return_code, stdout, stderr).
+            Tuple of (return_code, stdout tail, stderr tail).
+
+        The child runs in its own process group; on timeout or cancellation
+        the group gets SIGTERM, then SIGKILL after ``_procgroup.KILL_GRACE_SECONDS``.
 
         Raises:
             asyncio.TimeoutError: If the process exceeds *timeout*.
@@ -387,28 +795,49 @@ class ColmapAdapter(ReconEngineBase):
             cwd=cwd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            **SPAWN_KWARGS,
+        )
+
+        on_progress = None
+        if progress_cb is not None:
+            stage = cmd[1] if len(cmd) > 1 else cmd[0]
+            on_progress = lambda frac: progress_cb(stage, frac)
+
+        out_tail: deque = deque(maxlen=_LOG_TAIL_LINES)
+        err_tail: deque = deque(maxlen=_LOG_TAIL_LINES)
+        drains = asyncio.gather(
+            _drain_lines(proc.stdout, out_tail, on_progress),
+            _drain_lines(proc.stderr, err_tail, on_progress),
         )
         try:
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                proc.communicate(), timeout=timeout,
-            )
+            await wait_exit(proc, timeout)
         except asyncio.TimeoutError:
-            proc.kill()
-            await proc.wait()
             logger.error("Subprocess timed out after %.0fs: %s", timeout, cmd[0])
+            await terminate_process_group(proc)
             raise
-
-        stdout = stdout_bytes.decode("utf-8", errors="replace")
-        stderr = stderr_bytes.decode("utf-8", errors="replace")
+        except asyncio.CancelledError:
+            logger.warning("Subprocess cancelled, terminating: %s", " ".join(cmd))
+            await terminate_process_group(proc)
+            raise
+        finally:
+            # wait_for cancels the readers if the pipes outlive the process
+            try:
+                await asyncio.wait_for(drains, timeout=DRAIN_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                logger.debug("Subprocess output pipes still open after exit — not drained: %s", cmd[0])
+
+        stdout = b"".join(out_tail).decode("utf-8", errors="replace")
+        stderr = b"".join(err_tail).decode("utf-8", errors="replace")
         rc = proc.returncode or 0
 
         if rc != 0:
+            # Errors are at the end of the log, so report its last characters
             logger.error(
                 "Subprocess failed (rc=%d): %s\nstderr: %s",
-                rc, " ".join(cmd), stderr[:500],
+                rc, " ".join(cmd), stderr[-500:],
             )
             raise RuntimeError(
-                f"{cmd[0]} exited with code {rc}: {stderr[:200]}"
+                f"{cmd[0]} exited with code {rc}: {stderr[-200:]}"
             )
 
         logger.debug("Subprocess completed (rc=%d, stdout=%d bytes)", rc, len(stdout))
@@ -4,15 +4,26 @@ All endpoints prefixed with /api/drone/.
 """
 
 import asyncio
+import functools
+import itertools
 import logging
+import os
+import re
+import stat
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from starlette.datastructures import Headers
 
-from .models import PipelineStage
+from . import json_io
+from .models import DroneProject, PipelineStage
 from .pipeline_orchestrator import PipelineOrchestrator
 from .. import config
 
@@ -22,6 +33,57 @@ router = APIRouter(prefix="/api/drone", tags=["drone"])
 # Singleton orchestrator — initialized on import
 _orchestrator = PipelineOrchestrator()
 
+# Response class for the large listing endpoints (ORJSONResponse needs orjson)
+_JSON_RESPONSE = ORJSONResponse if json_io.HAS_ORJSON else JSONResponse
+
+
+# CityTiles folder names ("Tile-37-26-1-1" → row 37, col 26)
+_TILE_RE = re.compile(r"Tile-(\d+)-(\d+)")
+
+# Tile texture suffixes (lower-cased)
+_IMG_EXTS = frozenset({".jpg", ".jpeg", ".png"})
+
+# Tile file serving (see _CityTilesStaticFiles): suffix → content type, and
+# extra response headers (LOD files also get a 24-hour cache)
+_MEDIA_TYPES = {
+    ".obj": "text/plain",
+    ".mtl": "text/plain",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+_CORS_HEADERS = {"Access-Control-Allow-Origin": "*"}
+_CORS_CACHE_HEADERS = {**_CORS_HEADERS, "Cache-Control": "public, max-age=86400"}
+
+# Text tiles may have precompressed siblings ("x.obj.br", "x.obj.gz"),
+# tried in this order against the client's Accept-Encoding
+_COMPRESSIBLE_EXTS = frozenset({".obj", ".mtl"})
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Tile folder count above which list_citytiles scans folders in a thread pool
+_PARALLEL_SCAN_MIN = 64
+_SCAN_WORKERS = 8
+
+# list_citytiles() cache: tiles_dir → (st_mtime_ns, built_at, result).
+# Same scheme as lod_server: the viewer polls this endpoint, and a short TTL
+# picks up files replaced inside existing tile folders.
+_CITYTILES_CACHE: dict[str, tuple[int, float, dict]] = {}
+_CITYTILES_CACHE_TTL_SECONDS = 5.0
+
+
+# Background stage runs: at most MAX_CONCURRENT_STAGES at once overall,
+# and one per project (a second request while one is active gets 409)
+_stage_sem = asyncio.Semaphore(max(1, config.MAX_CONCURRENT_STAGES))
+_project_locks: dict[str, asyncio.Lock] = {}
+_background_tasks: set[asyncio.Task] = set()
+
+# project_id → sockets subscribed to /pipeline/ws/{project_id}
+_status_subscribers: dict[str, set[WebSocket]] = defaultdict(set)
+
+# Status pushes run inside the stage; a socket that takes longer than this
+# to accept a message is dropped so a stalled client can't hold up the run
+_WS_SEND_TIMEOUT_SECONDS = 2.0
+
 
 def get_orchestrator() -> PipelineOrchestrator:
     """Get the singleton orchestrator (allows main.py to inject dependencies)."""
@@ -40,11 +102,13 @@ class CreateProjectReq(BaseModel):
 
 class RunPipelineReq(BaseModel):
     project_id: str
+    force: bool = False                 # re-run stages whose inputs are unchanged
 
 
 class RunStageReq(BaseModel):
     project_id: str
     stage: str  # PipelineStage value
+    force: bool = False
 
 
 class IngestAnalyzeReq(BaseModel):
@@ -54,6 +118,7 @@ class IngestAnalyzeReq(BaseModel):
 
 class OptimizeReq(BaseModel):
     project_id: str
+    force: bool = False
 
 
 class UnityImportReq(BaseModel):
@@ -72,6 +137,20 @@ class DeployReq(BaseModel):
 # ── Project management ───────────────────────────────────────
 
 
+def _must_exist(project_id: str):
+    """Raise 404 unless *project_id* is a known project."""
+    if project_id not in _orchestrator.project_ids:
+        raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
+
+
+def _require_project(project_id: str) -> DroneProject:
+    """Look up *project_id* or raise 404."""
+    project = _orchestrator.get_project(project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
+    return project
+
+
 @router.post("/project/create")
 async def create_project(req: CreateProjectReq):
     """Create a new Drone2Twin project with standard folder structure."""
@@ -82,6 +161,7 @@ async def create_project(req: CreateProjectReq):
             preset=req.preset,
             base_dir=req.base_dir,
         )
+        _clear_citytiles_caches()
         return {
             "status": "created",
             "project": project.to_dict(),
@@ -93,13 +173,11 @@ async def create_project(req: CreateProjectReq):
 @router.get("/project/{project_id}")
 async def get_project(project_id: str):
     """Get project details."""
-    project = _orchestrator.get_project(project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
+    project = _require_project(project_id)
     return {"project": project.to_dict()}
 
 
-@router.get("/projects")
+@router.get("/projects", response_class=_JSON_RESPONSE)
 async def list_projects():
     """List all projects."""
     return {"projects": _orchestrator.list_projects()}
@@ -109,6 +187,10 @@ async def list_projects():
 async def delete_project(project_id: str):
     """Delete a project (metadata only)."""
     if _orchestrator.delete_project(project_id):
+        lock = _project_locks.get(project_id)
+        if lock is not None and not lock.locked():
+            del _project_locks[project_id]
+        _clear_citytiles_caches()
         return {"status": "deleted", "project_id": project_id}
     raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
 
@@ -116,15 +198,43 @@ async def delete_project(project_id: str):
 # ── Pipeline execution ───────────────────────────────────────
 
 
+async def _acquire_project_lock(project_id: str) -> asyncio.Lock:
+    """Take *project_id*'s run lock or raise 409 if a stage is already running."""
+    lock = _project_locks.setdefault(project_id, asyncio.Lock())
+    if lock.locked():
+        raise HTTPException(
+            status_code=409, detail=f"Project '{project_id}' already has a stage running"
+        )
+    # Uncontended, so this returns without yielding to another request
+    await lock.acquire()
+    return lock
+
+
+async def _start_background(project_id: str, coro_fn, *args, **kwargs):
+    """Run ``coro_fn(*args, **kwargs)`` as a background task under the stage limits."""
+    lock = await _acquire_project_lock(project_id)
+
+    async def _guarded():
+        try:
+            async with _stage_sem:
+                await coro_fn(*args, **kwargs)
+        finally:
+            lock.release()
+
+    task = asyncio.create_task(_guarded())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
 @router.post("/pipeline/run")
 async def run_pipeline(req: RunPipelineReq):
     """Run full pipeline (async background task)."""
-    project = _orchestrator.get_project(req.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
+    project = _require_project(req.project_id)
 
     # Run in background
-    asyncio.create_task(_orchestrator.run_pipeline(req.project_id))
+    await _start_background(
+        req.project_id, _orchestrator.run_pipeline, req.project_id, force=req.force
+    )
 
     return {
         "status": "started",
@@ -138,12 +248,38 @@ async def run_pipeline(req: RunPipelineReq):
 @router.get("/pipeline/status/{project_id}")
 async def pipeline_status(project_id: str):
     """Get current pipeline status."""
+    return _status_payload(_require_project(project_id))
+
+
+@router.websocket("/pipeline/ws/{project_id}")
+async def pipeline_status_ws(ws: WebSocket, project_id: str):
+    """Push pipeline status for a project on every stage change (instead of polling)."""
     project = _orchestrator.get_project(project_id)
     if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
+        await ws.close(code=4404)
+        return
 
+    await ws.accept()
+    subscribers = _status_subscribers[project_id]
+    subscribers.add(ws)
+    try:
+        await ws.send_json({"event": "drone_pipeline_status", "data": _status_payload(project)})
+        while True:
+            data = await ws.receive_text()
+            if data == "ping":
+                await ws.send_json({"event": "pong"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscribers.discard(ws)
+        if not subscribers:
+            _status_subscribers.pop(project_id, None)
+
+
+def _status_payload(project: DroneProject) -> dict:
+    """Pipeline status as returned by /pipeline/status and pushed over the WebSocket."""
     return {
-        "project_id": project_id,
+        "project_id": project.id,
         "name": project.name,
         "stage": project.stage.value,
         "input_option": project.input_option.value,
@@ -153,6 +289,25 @@ async def pipeline_status(project_id: str):
     }
 
 
+async def _push_status(project: DroneProject):
+    """Send *project*'s status to its WebSocket subscribers, dropping dead or stalled sockets."""
+    subscribers = _status_subscribers.get(project.id)
+    if not subscribers:
+        return
+    message = {"event": "drone_pipeline_status", "data": _status_payload(project)}
+    sockets = list(subscribers)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(ws.send_json(message), _WS_SEND_TIMEOUT_SECONDS) for ws in sockets),
+        return_exceptions=True,
+    )
+    for ws, result in zip(sockets, results):
+        if isinstance(result, Exception):
+            subscribers.discard(ws)
+
+
+_orchestrator.add_status_listener(_push_status)
+
+
 # ── Individual stage execution ───────────────────────────────
 
 
@@ -160,10 +315,13 @@ async def pipeline_status(project_id: str):
 async def ingest_analyze(req: IngestAnalyzeReq):
     """Run Ingest QA analysis."""
     if req.project_id:
-        project = _orchestrator.get_project(req.project_id)
-        if not project:
-            raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
-        result = await _orchestrator.run_stage(req.project_id, PipelineStage.INGEST_QA)
+        _must_exist(req.project_id)
+        lock = await _acquire_project_lock(req.project_id)
+        try:
+            async with _stage_sem:
+                result = await _orchestrator.run_stage(req.project_id, PipelineStage.INGEST_QA)
+        finally:
+            lock.release()
         return {
             "status": "completed",
             "project_id": req.project_id,
@@ -173,7 +331,7 @@ async def ingest_analyze(req: IngestAnalyzeReq):
         # Direct analysis without project
         from .ingest_qa import IngestQAEngine
         engine = IngestQAEngine()
-        report = engine.analyze_pack(req.pack_dir)
+        report = await asyncio.to_thread(engine.analyze_pack, req.pack_dir)
         return {
             "status": "completed",
             "qa_report": report.to_dict(),
@@ -185,12 +343,11 @@ async def ingest_analyze(req: IngestAnalyzeReq):
 @router.post("/recon/run")
 async def run_reconstruction(req: RunStageReq):
     """Run reconstruction stage (Option B only)."""
-    project = _orchestrator.get_project(req.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
+    _must_exist(req.project_id)
 
-    asyncio.create_task(
-        _orchestrator.run_stage(req.project_id, PipelineStage.RECONSTRUCTION)
+    await _start_background(
+        req.project_id, _orchestrator.run_stage, req.project_id, PipelineStage.RECONSTRUCTION,
+        force=req.force,
     )
     return {
         "status": "started",
@@ -202,12 +359,11 @@ async def run_reconstruction(req: RunStageReq):
 @router.post("/optimize/run")
 async def run_optimization(req: OptimizeReq):
     """Run mesh optimization stage."""
-    project = _orchestrator.get_project(req.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
+    _must_exist(req.project_id)
 
-    asyncio.create_task(
-        _orchestrator.run_stage(req.project_id, PipelineStage.OPTIMIZATION)
+    await _start_background(
+        req.project_id, _orchestrator.run_stage, req.project_id, PipelineStage.OPTIMIZATION,
+        force=req.force,
     )
     return {
         "status": "started",
@@ -219,12 +375,10 @@ async def run_optimization(req: OptimizeReq):
 @router.post("/unity/import")
 async def run_unity_import(req: UnityImportReq):
     """Run Unity import + tiling stage."""
-    project = _orchestrator.get_project(req.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
+    _must_exist(req.project_id)
 
-    asyncio.create_task(
-        _orchestrator.run_stage(req.project_id, PipelineStage.UNITY_IMPORT)
+    await _start_background(
+        req.project_id, _orchestrator.run_stage, req.project_id, PipelineStage.UNITY_IMPORT
     )
     return {
         "status": "started",
@@ -236,12 +390,10 @@ async def run_unity_import(req: UnityImportReq):
 @router.post("/webgl/build")
 async def run_webgl_build(req: WebGLBuildReq):
     """Run WebGL build stage."""
-    project = _orchestrator.get_project(req.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
+    _must_exist(req.project_id)
 
-    asyncio.create_task(
-        _orchestrator.run_stage(req.project_id, PipelineStage.WEBGL_BUILD)
+    await _start_background(
+        req.project_id, _orchestrator.run_stage, req.project_id, PipelineStage.WEBGL_BUILD
     )
     return {
         "status": "started",
@@ -253,12 +405,10 @@ async def run_webgl_build(req: WebGLBuildReq):
 @router.post("/deploy")
 async def run_deploy(req: DeployReq):
     """Deploy WebGL build to production."""
-    project = _orchestrator.get_project(req.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{req.project_id}' not found")
+    _must_exist(req.project_id)
 
-    asyncio.create_task(
-        _orchestrator.run_stage(req.project_id, PipelineStage.DEPLOY)
+    await _start_background(
+        req.project_id, _orchestrator.run_stage, req.project_id, PipelineStage.DEPLOY
     )
     return {
         "status": "started",
@@ -280,9 +430,13 @@ async def scan_obj_folder(req: OBJFolderScanReq):
     from .obj_folder_scanner import OBJFolderScanner
 
     scanner = OBJFolderScanner()
-    tiles = scanner.scan(req.folder_path)
-    warnings = scanner.validate_tiles(tiles)
-    grid = scanner.get_grid_info(tiles)
+
+    def _scan():
+        tiles = scanner.scan(req.folder_path)
+        return tiles, scanner.validate_tiles(tiles), scanner.get_grid_info(tiles)
+
+    # Filesystem-heavy — keep it off the event loop
+    tiles, warnings, grid = await asyncio.to_thread(_scan)
 
     return {
         "tile_count": len(tiles),
@@ -296,12 +450,10 @@ async def scan_obj_folder(req: OBJFolderScanReq):
 # ── Reports ──────────────────────────────────────────────────
 
 
-@router.get("/reports/{project_id}")
+@router.get("/reports/{project_id}", response_class=_JSON_RESPONSE)
 async def get_reports(project_id: str):
     """Get all reports for a project."""
-    project = _orchestrator.get_project(project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
+    _must_exist(project_id)
 
     return {
         "project_id": project_id,
@@ -312,120 +464,205 @@ async def get_reports(project_id: str):
 # ── City Tiles LOD ────────────────────────────────────────────
 
 
-@router.get("/citytiles-lod")
+@router.get("/citytiles-lod", response_class=_JSON_RESPONSE)
 async def list_citytiles_lod():
     """LOD metadata for all CityTiles (progressive web viewer loading)."""
     from .lod_server import discover_lod_metadata
     return discover_lod_metadata()
 
 
-@router.get("/citytiles/{tile_name}/LOD/{filename}")
-async def serve_citytile_lod_file(tile_name: str, filename: str):
-    """Serve a LOD OBJ file with 24-hour cache."""
-    from .lod_server import get_lod_file_path
-
-    file_path = get_lod_file_path(tile_name, filename)
-    if file_path is None:
-        raise HTTPException(status_code=404, detail=f"LOD file not found: {tile_name}/LOD/{filename}")
-
-    return FileResponse(
-        path=str(file_path),
-        media_type="text/plain",
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Cache-Control": "public, max-age=86400",
-        },
-    )
-
-
 # ── City Tiles 3D Viewer ─────────────────────────────────────
 
 
+@functools.cache
 def _get_citytiles_dir() -> Path:
-    """Get the CityTiles asset directory."""
+    """Get the CityTiles asset directory (config is fixed for the process)."""
     return Path(config.UNITY_PROJECT_PATH) / "Assets" / "CityTiles"
 
 
-@router.get("/citytiles")
+def _clear_citytiles_caches():
+    """Drop cached /citytiles and /citytiles-lod listings."""
+    from .lod_server import clear_cache
+
+    _CITYTILES_CACHE.clear()
+    clear_cache()
+
+
+@router.get("/citytiles", response_class=_JSON_RESPONSE)
 async def list_citytiles():
     """List all CityTiles with metadata for 3D viewer."""
-    import re
-
     tiles_dir = _get_citytiles_dir()
-    if not tiles_dir.is_dir():
+    try:
+        st = os.stat(tiles_dir)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISDIR(st.st_mode):
         return {"tiles": [], "message": "CityTiles directory not found"}
 
-    tile_re = re.compile(r"Tile-(\d+)-(\d+)")
-    tiles = []
-
-    for folder in sorted(tiles_dir.iterdir()):
-        if not folder.is_dir():
-            continue
-        m = tile_re.search(folder.name)
-        if not m:
-            continue
-
-        row, col = int(m.group(1)), int(m.group(2))
-
-        # Find OBJ file
-        obj_files = list(folder.glob("*.obj"))
-        if not obj_files:
-            continue
-
-        obj_file = obj_files[0]
-        mtl_file = obj_file.with_suffix(".mtl")
-
-        # Find textures
-        tex_files = list(folder.glob("*.jpg")) + list(folder.glob("*.png"))
-
-        tile_info = {
-            "name": folder.name,
-            "row": row,
-            "col": col,
-            "obj_file": obj_file.name,
-            "mtl_file": mtl_file.name if mtl_file.exists() else None,
-            "textures": [t.name for t in tex_files],
-            "size_mb": round(obj_file.stat().st_size / (1024 * 1024), 1),
-            "obj_url": f"/api/drone/citytiles/{folder.name}/{obj_file.name}",
-            "mtl_url": f"/api/drone/citytiles/{folder.name}/{mtl_file.name}" if mtl_file.exists() else None,
-        }
-        tiles.append(tile_info)
+    cache_key = str(tiles_dir)
+    cached = _CITYTILES_CACHE.get(cache_key)
+    now = time.monotonic()
+    if (cached is not None and cached[0] == st.st_mtime_ns
+            and now - cached[1] < _CITYTILES_CACHE_TTL_SECONDS):
+        return cached[2]
+
+    result = await asyncio.to_thread(_scan_citytiles, tiles_dir)
+    _CITYTILES_CACHE[cache_key] = (st.st_mtime_ns, now, result)
+    return result
+
+
+def _scan_tile_folder(name: str, path: str, row: int, col: int) -> Optional[dict]:
+    """list_citytiles() entry for one tile folder, or None if it has no OBJ."""
+    # One pass over the tile folder: classify OBJ / MTL / textures by suffix
+    obj_entry = None
+    mtl_names = []
+    textures = []
+    with os.scandir(path) as it:
+        for entry in it:
+            entry_name = entry.name
+            suffix = entry_name[entry_name.rfind("."):].lower() if "." in entry_name else ""
+            if suffix == ".obj":
+                if obj_entry is None and entry.is_file():
+                    obj_entry = entry
+            elif suffix == ".mtl":
+                mtl_names.append(entry_name)
+            elif suffix in _IMG_EXTS:
+                textures.append(entry_name)
+
+    if obj_entry is None:
+        return None
+
+    textures.sort()
+    obj_name = obj_entry.name
+    stem = obj_name[:-4]
+    mtl_name = next((n for n in mtl_names if n[:-4] == stem), None)
+    has_mtl = mtl_name is not None
+
+    return {
+        "name": name,
+        "row": row,
+        "col": col,
+        "obj_file": obj_name,
+        "mtl_file": mtl_name if has_mtl else None,
+        "textures": textures,
+        "size_mb": round(obj_entry.stat().st_size / (1024 * 1024), 1),
+        "obj_url": f"/api/drone/citytiles/{name}/{obj_name}",
+        "mtl_url": f"/api/drone/citytiles/{name}/{mtl_name}" if has_mtl else None,
+    }
+
+
+def _scan_citytiles(tiles_dir: Path) -> dict:
+    """Build the list_citytiles() response for *tiles_dir*."""
+    with os.scandir(tiles_dir) as it:
+        folders = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
 
-    # Group by row
-    rows = {}
-    for t in tiles:
-        rows.setdefault(t["row"], []).append(t)
+    jobs = []
+    for folder in folders:
+        m = _TILE_RE.match(folder.name)
+        if m:
+            jobs.append((folder.name, folder.path, int(m.group(1)), int(m.group(2))))
+
+    # Large grids: scan tile folders concurrently (scandir/stat release the GIL)
+    if len(jobs) < _PARALLEL_SCAN_MIN:
+        scanned = [_scan_tile_folder(*job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as pool:
+            scanned = list(pool.map(lambda job: _scan_tile_folder(*job), jobs))
+    tiles = [t for t in scanned if t is not None]
+
+    # One (row, col) sort gives both the tile order and each row's grouping
+    tiles.sort(key=lambda t: (t["row"], t["col"]))
+    rows = {str(r): list(ts) for r, ts in itertools.groupby(tiles, key=lambda t: t["row"])}
 
     return {
         "tile_count": len(tiles),
         "total_size_mb": round(sum(t["size_mb"] for t in tiles), 1),
-        "rows": {str(r): sorted(ts, key=lambda x: x["col"]) for r, ts in sorted(rows.items())},
+        "rows": rows,
         "tiles": tiles,
     }
 
 
-@router.get("/citytiles/{tile_name}/{filename}")
-async def serve_citytile_file(tile_name: str, filename: str):
-    """Serve an OBJ, MTL, or texture file from CityTiles."""
-    tiles_dir = _get_citytiles_dir()
-    file_path = tiles_dir / tile_name / filename
-
-    if not file_path.is_file():
-        raise HTTPException(status_code=404, detail=f"File not found: {tile_name}/{filename}")
-
-    # Determine content type
-    suffix = file_path.suffix.lower()
-    media_types = {
-        ".obj": "text/plain",
-        ".mtl": "text/plain",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-    }
-    media_type = media_types.get(suffix, "application/octet-stream")
-
-    return FileResponse(
-        path=str(file_path),
-        media_type=media_type,
-        headers={"Access-Control-Allow-Origin": "*"},
+# ── City Tiles file serving ──────────────────────────────────
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Content codings from an Accept-Encoding header (q=0 entries dropped)."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        key, _, value = params.partition("=")
+        if key.strip().lower() == "q":
+            try:
+                if float(value) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class _CityTilesStaticFiles(StaticFiles):
+    """StaticFiles for CityTiles OBJ/MTL/texture and LOD files.
+
+    On top of StaticFiles (ETag/304, Range, path checks) this sets the tile
+    media types and CORS/cache headers, and serves a precompressed sibling
+    ("x.obj.br", "x.obj.gz") of OBJ/MTL files when the client accepts it.
+    """
+
+    async def get_response(self, path: str, scope) -> Response:
+        parts = Path(path).parts
+        suffix = os.path.splitext(path)[1].lower()
+        encoding = None
+        response = None
+
+        if suffix in _COMPRESSIBLE_EXTS and scope["method"] in ("GET", "HEAD"):
+            headers = Headers(scope=scope)
+            # Ranges are always served from the uncompressed file
+            if "range" not in headers:
+                accepted = _accepted_encodings(headers.get("accept-encoding", ""))
+                variant = await asyncio.to_thread(self._precompressed_variant, path, accepted)
+                if variant is not None:
+                    full_path, variant_st, encoding = variant
+                    response = self.file_response(full_path, variant_st, scope)
+
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        is_lod = len(parts) > 2 and parts[-2] == "LOD"
+        response.headers.update(_CORS_CACHE_HEADERS if is_lod else _CORS_HEADERS)
+        media_type = _MEDIA_TYPES.get(suffix)
+        if media_type and "content-type" in response.headers:
+            response.headers["content-type"] = media_type
+        if suffix in _COMPRESSIBLE_EXTS:
+            response.headers.add_vary_header("Accept-Encoding")
+        if encoding is not None:
+            response.headers["content-encoding"] = encoding
+        return response
+
+    def _precompressed_variant(self, path: str, accepted: set[str]):
+        """(full_path, stat, encoding) of a usable compressed sibling of *path*, or None."""
+        _, st = self.lookup_path(path)
+        if st is None or not stat.S_ISREG(st.st_mode):
+            return None
+        for encoding, ext in _PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            full_path, variant_st = self.lookup_path(path + ext)
+            # Skip a sibling left over from an older version of the file
+            if (variant_st is not None and stat.S_ISREG(variant_st.st_mode)
+                    and variant_st.st_mtime_ns >= st.st_mtime_ns):
+                return full_path, variant_st, encoding
+        return None
+
+
+def mount_citytiles(app):
+    """Mount CityTiles file serving at /api/drone/citytiles/{tile}/{file} on *app*.
+
+    Call after include_router(router) so /citytiles and /citytiles-lod
+    keep matching the router's listing endpoints.
+    """
+    app.mount(
+        "/api/drone/citytiles",
+        _CityTilesStaticFiles(directory=str(_get_citytiles_dir()), check_dir=False),
+        name="citytiles",
     )
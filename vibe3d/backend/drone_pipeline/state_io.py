@@ -0,0 +1,36 @@
+"""Encode/decode helpers for internal Drone2Twin project state files.
+
+Project metadata is only read back by the orchestrator, so it is stored as
+msgpack when installed (faster than JSON on nested dicts of short strings)
+and falls back to JSON via json_io otherwise. API responses stay JSON.
+"""
+
+from typing import Any
+
+from . import json_io
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+HAS_MSGPACK = msgpack is not None
+
+# File suffix of the state format written by serialize_state()
+STATE_SUFFIX = ".msgpack" if HAS_MSGPACK else ".json"
+
+
+def serialize_state(state: dict) -> bytes:
+    """Encode a state dict in the STATE_SUFFIX format."""
+    if msgpack is not None:
+        return msgpack.packb(state, use_bin_type=True)
+    return json_io.dumps(state, indent=True)
+
+
+def load_state(data: bytes, suffix: str = STATE_SUFFIX) -> Any:
+    """Decode state bytes read from a file with the given suffix."""
+    if suffix == ".msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.unpackb(data, raw=False)
+    return json_io.loads(data)
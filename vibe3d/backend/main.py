@@ -36,7 +36,9 @@ from .workflow_manager import WorkflowManager
 from .nlu_engine import NLUEngine
 from .component_library import ComponentLibrary
 from .webgl_builder import generate_setup_plan, generate_build_plan
-from .drone_pipeline.router import router as drone_router, get_orchestrator as get_drone_orchestrator
+from .drone_pipeline.router import (
+    router as drone_router, get_orchestrator as get_drone_orchestrator, mount_citytiles,
+)
 from .drone_pipeline.geobim_router import router as geobim_router
 from .drone_pipeline.mesh_edit_router import router as mesh_edit_router
 from .drone_pipeline.mesh_edit_manager import get_manager as get_mesh_edit_manager
@@ -91,6 +93,7 @@ if frontend_dir.exists():
 
 # ── Drone2Twin Pipeline Router ───────────────────────────────
 app.include_router(drone_router)
+mount_citytiles(app)
 app.include_router(geobim_router)
 app.include_router(mesh_edit_router)
 app.include_router(wizard_router)
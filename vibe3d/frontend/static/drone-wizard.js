@@ -778,6 +778,9 @@ class DroneWizard {
                 this._showMsg(`단계 완료: ${data.stage}`, 'success');
                 this._refreshProject().then(() => this._render());
                 break;
+            case 'drone_stage_skipped':
+                this._showMsg(`단계 건너뜀 (변경 없음): ${data.stage}`);
+                break;
             case 'drone_pipeline_complete':
                 this._showMsg(`파이프라인 완료! (${data.stages_completed} 단계)`, 'success');
                 this._refreshProject().then(() => this._render());
@@ -789,6 +792,12 @@ class DroneWizard {
             case 'drone_tile_progress':
                 this._updateTileProgress(data);
                 break;
+            case 'drone_tile_progress_batch':
+                // Only the latest tile matters for the progress bar
+                if (data.items && data.items.length) {
+                    this._updateTileProgress(data.items[data.items.length - 1]);
+                }
+                break;
             case 'drone_tiles_complete':
                 this._onTilesComplete(data);
                 break;